@@ -4,18 +4,44 @@ Contiene la logica completa per l'invio dell'email via SMTP e API,
 gestione degli allegati, autenticazione e token OAuth.
 """
 
+import atexit
 import base64
+import enum
+import hashlib
 import os
 import re
 import smtplib
+import threading
+import time
 from typing import List, Sequence, Tuple
 
 import requests
-from email import encoders
 from email.mime.base import MIMEBase
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
+class SendStatus(enum.IntEnum):
+    """Esito di un invio, restituito insieme al messaggio descrittivo."""
+
+    OK = 0
+    VALIDATION_ERR = 1
+    ATTACHMENT_ERR = 2
+    AUTH_ERR = 3
+    SMTP_ERR = 4
+    API_ERR = 5
+
+
+# Numero massimo di personalizations per singola richiesta (limite SendGrid)
+API_BULK_CHUNK_SIZE = 1000
+
+# Sessione HTTP condivisa: riusa le connessioni TCP/TLS tra le chiamate API
+_HTTP = requests.Session()
+
+# Pool di connessioni SMTP: (host, porta, modalità, username, digest password) -> (server, ultimo uso)
+SMTP_CACHE_TTL_SECONDS = 30
+_SMTP_CACHE = {}
+_SMTP_CACHE_LOCK = threading.Lock()
+
 def ottieni_token_oauth(url_token: str, api_key: str, api_secret: str) -> str:
     """
     Ottiene un token OAuth2 utilizzando le credenziali API.
@@ -70,6 +96,43 @@ def _build_api_headers(token: str, api_key: str, api_secret: str) -> dict:
     return headers
 
 
+def _prepara_allegati_api(attachments: List[str]) -> Tuple[List[dict], str]:
+    """
+    Legge e codifica in base64 gli allegati per il payload API.
+
+    :return: (lista allegati, eventuale messaggio di errore)
+    """
+    attachments_data = []
+    for file_path in attachments:
+        if not os.path.exists(file_path):
+            continue
+
+        try:
+            with open(file_path, "rb") as file:
+                file_content = base64.b64encode(file.read()).decode()
+                attachments_data.append({
+                    "filename": os.path.basename(file_path),
+                    "content": file_content,
+                    "content_type": "application/octet-stream"
+                })
+        except Exception as e:
+            return [], f"Errore durante la lettura dell'allegato {file_path}: {str(e)}"
+
+    return attachments_data, ""
+
+
+def _messaggio_errore_api(response) -> str:
+    """Costruisce il messaggio di errore a partire dalla risposta API."""
+    parts = [f"Errore API: {response.status_code}"]
+    try:
+        error_data = response.json()
+        parts.append(str(error_data.get("message") or error_data.get("error") or ""))
+    except Exception:
+        parts.append(response.text[:200])
+
+    return " - ".join(part for part in parts if part)
+
+
 def invia_email_api(
     url_send: str,
     headers: dict,
@@ -82,7 +145,7 @@ def invia_email_api(
     nickname: str,
     body_format: str,
     attachments: List[str]
-) -> str:
+) -> Tuple[SendStatus, str]:
     """
     Invia email utilizzando API REST.
 
@@ -97,7 +160,7 @@ def invia_email_api(
     :param nickname: Nome visualizzato
     :param body_format: Formato del corpo (plain/html)
     :param attachments: Lista file allegati
-    :return: Messaggio di risultato
+    :return: (SendStatus, messaggio di risultato)
     """
     try:
         # Preparazione destinatari
@@ -110,21 +173,9 @@ def invia_email_api(
             bcc_recipients = [email.strip() for email in bcc.split(",") if email.strip()]
         
         # Preparazione allegati
-        attachments_data = []
-        for file_path in attachments:
-            if not os.path.exists(file_path):
-                continue
-                
-            try:
-                with open(file_path, "rb") as file:
-                    file_content = base64.b64encode(file.read()).decode()
-                    attachments_data.append({
-                        "filename": os.path.basename(file_path),
-                        "content": file_content,
-                        "content_type": "application/octet-stream"
-                    })
-            except Exception as e:
-                return f"Errore durante la lettura dell'allegato {file_path}: {str(e)}"
+        attachments_data, errore = _prepara_allegati_api(attachments)
+        if errore:
+            return SendStatus.ATTACHMENT_ERR, errore
         
         # Payload per l'API
         payload = {
@@ -151,29 +202,93 @@ def invia_email_api(
             payload["attachments"] = attachments_data
         
         # Invio richiesta
-        response = requests.post(url_send, headers=headers, json=payload, timeout=60)
+        response = _HTTP.post(url_send, headers=headers, json=payload, timeout=60)
         
         if response.status_code in [200, 201, 202]:
-            return "Email inviata con successo tramite API!"
+            return SendStatus.OK, "Email inviata con successo tramite API!"
         else:
-            error_msg = f"Errore API: {response.status_code}"
-            try:
-                error_data = response.json()
-                if "message" in error_data:
-                    error_msg += f" - {error_data['message']}"
-                elif "error" in error_data:
-                    error_msg += f" - {error_data['error']}"
-            except:
-                error_msg += f" - {response.text[:200]}"
-            
-            return error_msg
+            return SendStatus.API_ERR, _messaggio_errore_api(response)
             
     except requests.exceptions.Timeout:
-        return "Errore: Timeout durante l'invio tramite API"
+        return SendStatus.API_ERR, "Errore: Timeout durante l'invio tramite API"
+    except requests.exceptions.ConnectionError:
+        return SendStatus.API_ERR, "Errore: Impossibile connettersi al server API"
+    except Exception as e:
+        return SendStatus.API_ERR, f"Errore durante l'invio tramite API: {str(e)}"
+
+def invia_email_api_bulk(
+    url_send: str,
+    headers: dict,
+    sender: str,
+    recipients_list: Sequence[str],
+    subject: str,
+    body: str,
+    nickname: str,
+    body_format: str,
+    attachments: List[str]
+) -> Tuple[SendStatus, str]:
+    """
+    Invia la stessa email a molti destinatari con una sola richiesta API
+    per blocco, usando una personalization per destinatario.
+
+    :param url_send: URL dell'API per l'invio
+    :param headers: Header HTTP completi di autenticazione
+    :param sender: Mittente
+    :param recipients_list: Lista dei destinatari (uno per personalization)
+    :param subject: Oggetto
+    :param body: Corpo del messaggio
+    :param nickname: Nome visualizzato
+    :param body_format: Formato del corpo (plain/html)
+    :param attachments: Lista file allegati
+    :return: (SendStatus, messaggio di risultato)
+    """
+    recipients = [email.strip() for email in recipients_list if email.strip()]
+    if not recipients:
+        return SendStatus.VALIDATION_ERR, "Errore: Nessun destinatario specificato"
+
+    try:
+        attachments_data, errore = _prepara_allegati_api(attachments)
+        if errore:
+            return SendStatus.ATTACHMENT_ERR, errore
+
+        payload = {
+            "from": {
+                "email": sender,
+                "name": nickname if nickname else sender
+            },
+            "subject": subject if subject else "(Nessun oggetto)",
+            "content": [
+                {
+                    "type": f"text/{body_format}",
+                    "value": body
+                }
+            ]
+        }
+        if attachments_data:
+            payload["attachments"] = attachments_data
+
+        inviati = 0
+        for start in range(0, len(recipients), API_BULK_CHUNK_SIZE):
+            chunk = recipients[start:start + API_BULK_CHUNK_SIZE]
+            chunk_payload = dict(payload)
+            chunk_payload["personalizations"] = [{"to": [{"email": email}]} for email in chunk]
+
+            response = _HTTP.post(url_send, headers=headers, json=chunk_payload, timeout=60)
+            if response.status_code not in [200, 201, 202]:
+                errore = _messaggio_errore_api(response)
+                if inviati:
+                    errore += f" (già inviate {inviati} email)"
+                return SendStatus.API_ERR, errore
+            inviati += len(chunk)
+
+        return SendStatus.OK, f"Email inviata con successo tramite API a {inviati} destinatario/i!"
+
+    except requests.exceptions.Timeout:
+        return SendStatus.API_ERR, "Errore: Timeout durante l'invio tramite API"
     except requests.exceptions.ConnectionError:
-        return "Errore: Impossibile connettersi al server API"
+        return SendStatus.API_ERR, "Errore: Impossibile connettersi al server API"
     except Exception as e:
-        return f"Errore durante l'invio tramite API: {str(e)}"
+        return SendStatus.API_ERR, f"Errore durante l'invio tramite API: {str(e)}"
 
 def valida_allegati(attachments: List[str]) -> Tuple[List[str], List[str]]:
     """
@@ -232,6 +347,131 @@ def valida_email_indirizzi(sender: str, to_addr: str, cc: str, bcc: str) -> Tupl
 
     return True, ""
 
+def _crea_parte_allegato(file_path: str) -> MIMEBase:
+    """
+    Crea la parte MIME base64 per un allegato.
+
+    La codifica avviene direttamente sui byte letti con ``base64.encodebytes``
+    (implementata in C, righe da 76 caratteri), evitando il doppio passaggio
+    decode/encode di ``encoders.encode_base64``.
+    """
+    with open(file_path, "rb") as attachment:
+        data = attachment.read()
+
+    part = MIMEBase("application", "octet-stream")
+    part.set_payload(base64.encodebytes(data).decode("ascii"))
+    part["Content-Transfer-Encoding"] = "base64"
+    filename = os.path.basename(file_path)
+    part.add_header(
+        "Content-Disposition",
+        f"attachment; filename= {filename}"
+    )
+    return part
+
+def modalita_smtp(smtps_465: bool, starttls: bool) -> str:
+    """Restituisce la modalità di connessione: "ssl", "starttls" o "plain"."""
+    if smtps_465:
+        return "ssl"
+    return "starttls" if starttls else "plain"
+
+
+def _chiudi_connessione_smtp(server) -> None:
+    try:
+        server.quit()
+    except Exception:
+        try:
+            server.close()
+        except Exception:
+            pass
+
+
+def _chiave_smtp(host: str, port: int, modalita: str, username: str, password: str) -> tuple:
+    """
+    Chiave del pool SMTP. Include un digest della password: con credenziali
+    cambiate non si riusa una sessione autenticata con quelle precedenti.
+    """
+    digest = hashlib.sha256(password.encode("utf-8")).hexdigest() if username else ""
+    return (host, port, modalita, username, digest)
+
+
+def apri_connessione_smtp(
+    host: str,
+    port: int,
+    modalita: str,
+    username: str = "",
+    password: str = "",
+    timeout: float = 30
+) -> smtplib.SMTP:
+    """
+    Restituisce una connessione SMTP pronta (EHLO, STARTTLS e login già eseguiti).
+
+    Se nel pool c'è una connessione per (host, porta, modalità, credenziali) usata
+    da meno di SMTP_CACHE_TTL_SECONDS e che risponde al NOOP, viene riutilizzata
+    evitando un nuovo handshake TLS. La connessione va restituita con
+    rilascia_connessione_smtp al termine dell'uso.
+    """
+    chiave = _chiave_smtp(host, port, modalita, username, password)
+    with _SMTP_CACHE_LOCK:
+        cached = _SMTP_CACHE.pop(chiave, None)
+
+    if cached is not None:
+        server, ultimo_uso = cached
+        if time.monotonic() - ultimo_uso < SMTP_CACHE_TTL_SECONDS:
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except Exception:
+                pass
+        _chiudi_connessione_smtp(server)
+
+    if modalita == "ssl":
+        server = smtplib.SMTP_SSL(host, port, timeout=timeout)
+        server.ehlo()
+    else:
+        server = smtplib.SMTP(host, port, timeout=timeout)
+        server.ehlo()
+        if modalita == "starttls":
+            server.starttls()
+            server.ehlo()
+
+    if username:
+        try:
+            server.login(username, password)
+        except Exception:
+            _chiudi_connessione_smtp(server)
+            raise
+
+    return server
+
+
+def rilascia_connessione_smtp(
+    server,
+    host: str,
+    port: int,
+    modalita: str,
+    username: str = "",
+    password: str = ""
+) -> None:
+    """Rimette nel pool una connessione ancora valida ottenuta da apri_connessione_smtp."""
+    chiave = _chiave_smtp(host, port, modalita, username, password)
+    with _SMTP_CACHE_LOCK:
+        precedente = _SMTP_CACHE.pop(chiave, None)
+        _SMTP_CACHE[chiave] = (server, time.monotonic())
+    if precedente is not None:
+        _chiudi_connessione_smtp(precedente[0])
+
+
+def chiudi_connessioni_smtp() -> None:
+    """Chiude tutte le connessioni SMTP rimaste nel pool."""
+    with _SMTP_CACHE_LOCK:
+        connessioni = list(_SMTP_CACHE.values())
+        _SMTP_CACHE.clear()
+    for server, _ in connessioni:
+        _chiudi_connessione_smtp(server)
+
+
+atexit.register(chiudi_connessioni_smtp)
+
 def prepara_messaggio_smtp(
     sender: str,
     recipient: str,
@@ -257,8 +497,10 @@ def prepara_messaggio_smtp(
         msg['Cc'] = cc
     msg['Subject'] = subject if subject else "(Nessun oggetto)"
     
-    # Corpo del messaggio
-    msg.attach(MIMEText(body, body_format))
+    # Corpo del messaggio: charset esplicito per evitare il tentativo di encode
+    # di MIMEText (us-ascii viene trasmesso in 7bit senza ulteriore codifica)
+    charset = "us-ascii" if body.isascii() else "utf-8"
+    msg.attach(MIMEText(body, body_format, charset))
     
     # Preparazione lista destinatari completa
     destinatari = [recipient.strip()]
@@ -272,17 +514,7 @@ def prepara_messaggio_smtp(
     
     for file_path in allegati_validi:
         try:
-            with open(file_path, "rb") as attachment:
-                part = MIMEBase("application", "octet-stream")
-                part.set_payload(attachment.read())
-            
-            encoders.encode_base64(part)
-            filename = os.path.basename(file_path)
-            part.add_header(
-                "Content-Disposition",
-                f"attachment; filename= {filename}"
-            )
-            msg.attach(part)
+            msg.attach(_crea_parte_allegato(file_path))
             
         except Exception as e:
             errori_allegati.append(f"Errore allegato {os.path.basename(file_path)}: {str(e)}")
@@ -312,7 +544,7 @@ def invia_email(
     token_required: bool,
     body_format: str,
     attachments: List[str]
-):
+) -> Tuple[SendStatus, str]:
     """
     Funzione principale per l'invio email tramite SMTP o API.
     
@@ -338,16 +570,16 @@ def invia_email(
     :param token_required: Flag che indica se è richiesto un token API
     :param body_format: Formato del corpo dell'email (plain o html)
     :param attachments: Lista di percorsi file da allegare
-    :return: Messaggio di stato sull'esito dell'operazione
+    :return: (SendStatus, messaggio di stato sull'esito dell'operazione)
     """
     
     # Validazione campi obbligatori
     if not sender or not recipient:
-        return "Errore: Mittente e destinatario sono obbligatori"
+        return SendStatus.VALIDATION_ERR, "Errore: Mittente e destinatario sono obbligatori"
 
     valido, msg = valida_email_indirizzi(sender.strip(), recipient.strip(), cc.strip(), bcc.strip())
     if not valido:
-        return msg
+        return SendStatus.VALIDATION_ERR, msg
     
     # Invio tramite API
     if auth_method == "api":
@@ -355,17 +587,17 @@ def invia_email(
             token = ""
             if token_required:
                 if not url_token or not url_send:
-                    return "Errore: URL Token e Send sono obbligatori quando il token è richiesto"
+                    return SendStatus.VALIDATION_ERR, "Errore: URL Token e Send sono obbligatori quando il token è richiesto"
                 if not api_key or not api_secret:
-                    return "Errore: API Key e Secret sono necessari quando il token è richiesto"
+                    return SendStatus.VALIDATION_ERR, "Errore: API Key e Secret sono necessari quando il token è richiesto"
 
                 # Ottieni token OAuth
                 token = ottieni_token_oauth(url_token, api_key, api_secret)
                 if not token:
-                    return "Errore: Impossibile ottenere il token di accesso"
+                    return SendStatus.AUTH_ERR, "Errore: Impossibile ottenere il token di accesso"
 
             if not url_send:
-                return "Errore: URL Send è obbligatorio per l'invio via API"
+                return SendStatus.VALIDATION_ERR, "Errore: URL Send è obbligatorio per l'invio via API"
 
             headers = _build_api_headers(token, api_key, api_secret)
 
@@ -376,20 +608,20 @@ def invia_email(
             )
 
         except Exception as e:
-            return f"Errore durante l'invio tramite API: {str(e)}"
+            return SendStatus.API_ERR, f"Errore durante l'invio tramite API: {str(e)}"
     
     # Invio tramite SMTP
     if auth_method in ["smtp", "none"]:
         if not smtp_server or not smtp_port:
-            return "Errore: Server SMTP e porta sono obbligatori"
+            return SendStatus.VALIDATION_ERR, "Errore: Server SMTP e porta sono obbligatori"
         
         try:
             smtp_port = int(smtp_port)
         except ValueError:
-            return "Errore: La porta deve essere un numero intero"
+            return SendStatus.VALIDATION_ERR, "Errore: La porta deve essere un numero intero"
         
         if smtp_port < 1 or smtp_port > 65535:
-            return "Errore: La porta deve essere compresa tra 1 e 65535"
+            return SendStatus.VALIDATION_ERR, "Errore: La porta deve essere compresa tra 1 e 65535"
         
         # Preparazione messaggio
         try:
@@ -399,37 +631,26 @@ def invia_email(
             )
             
             if errori_allegati:
-                return f"Errori con gli allegati: {'; '.join(errori_allegati)}"
+                return SendStatus.ATTACHMENT_ERR, f"Errori con gli allegati: {'; '.join(errori_allegati)}"
             
         except Exception as e:
-            return f"Errore durante la preparazione del messaggio: {str(e)}"
+            return SendStatus.SMTP_ERR, f"Errore durante la preparazione del messaggio: {str(e)}"
         
-        # Connessione e invio SMTP
+        if auth_method == "smtp" and (not username or not password):
+            return SendStatus.VALIDATION_ERR, "Errore: Username e password sono obbligatori per l'autenticazione SMTP"
+
+        modalita = modalita_smtp(smtps_465, starttls_25 or starttls_587)
+        login = username if auth_method == "smtp" else ""
+
+        # Connessione (riutilizzata se ancora attiva) e invio SMTP
         try:
-            # Stabilisci connessione
-            if smtps_465:
-                server = smtplib.SMTP_SSL(smtp_server, smtp_port, timeout=30)
-                server.ehlo()
-            else:
-                server = smtplib.SMTP(smtp_server, smtp_port, timeout=30)
-                server.ehlo()
-                
-                # STARTTLS se richiesto
-                if starttls_25 or starttls_587:
-                    server.starttls()
-                    server.ehlo()
-            
-            # Autenticazione se richiesta
-            if auth_method == "smtp":
-                if not username or not password:
-                    server.quit()
-                    return "Errore: Username e password sono obbligatori per l'autenticazione SMTP"
-                
-                server.login(username, password)
-            
-            # Invio del messaggio
-            server.sendmail(sender, destinatari, msg.as_string())
-            server.quit()
+            server = apri_connessione_smtp(smtp_server, smtp_port, modalita, login, password, timeout=30)
+            try:
+                server.sendmail(sender, destinatari, msg.as_string())
+            except Exception:
+                _chiudi_connessione_smtp(server)
+                raise
+            rilascia_connessione_smtp(server, smtp_server, smtp_port, modalita, login, password)
             
             # Messaggio di successo con dettagli
             num_destinatari = len(destinatari)
@@ -439,21 +660,21 @@ def invia_email(
             if num_allegati > 0:
                 dettagli += f" con {num_allegati} allegato/i"
             
-            return dettagli
+            return SendStatus.OK, dettagli
             
         except smtplib.SMTPAuthenticationError:
-            return "Errore: Autenticazione fallita. Verificare username e password"
+            return SendStatus.AUTH_ERR, "Errore: Autenticazione fallita. Verificare username e password"
         except smtplib.SMTPRecipientsRefused:
-            return "Errore: Uno o più destinatari sono stati rifiutati dal server"
+            return SendStatus.SMTP_ERR, "Errore: Uno o più destinatari sono stati rifiutati dal server"
         except smtplib.SMTPSenderRefused:
-            return "Errore: Il mittente è stato rifiutato dal server"
+            return SendStatus.SMTP_ERR, "Errore: Il mittente è stato rifiutato dal server"
         except smtplib.SMTPDataError as e:
-            return f"Errore durante l'invio dei dati: {str(e)}"
+            return SendStatus.SMTP_ERR, f"Errore durante l'invio dei dati: {str(e)}"
         except smtplib.SMTPConnectError:
-            return f"Errore: Impossibile connettersi al server {smtp_server}:{smtp_port}"
+            return SendStatus.SMTP_ERR, f"Errore: Impossibile connettersi al server {smtp_server}:{smtp_port}"
         except smtplib.SMTPServerDisconnected:
-            return "Errore: Il server ha chiuso la connessione inaspettatamente"
+            return SendStatus.SMTP_ERR, "Errore: Il server ha chiuso la connessione inaspettatamente"
         except Exception as e:
-            return f"Errore SMTP: {str(e)}"
+            return SendStatus.SMTP_ERR, f"Errore SMTP: {str(e)}"
     
-    return "Errore: Metodo di autenticazione non riconosciuto"
+    return SendStatus.VALIDATION_ERR, "Errore: Metodo di autenticazione non riconosciuto"
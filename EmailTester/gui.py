@@ -4,25 +4,182 @@ Contiene la definizione dell'interfaccia grafica (Tkinter) migliorata e la logic
 per raccogliere i dati e invocare la funzione di invio email.
 """
 
+import array
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import smtplib
 import os
-import time
-
-from email_service import invia_email, valida_email_indirizzi
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+from email_service import (
+    SendStatus,
+    apri_connessione_smtp,
+    invia_email,
+    modalita_smtp,
+    rilascia_connessione_smtp,
+    valida_email_indirizzi,
+)
 
 # Variabili globali
-attachments = []
 MIN_DELAY_SECONDS = 1
+LARGE_LIST_THRESHOLD = 1000
+# Windows/macOS usano <MouseWheel>, Linux (X11) i pulsanti 4 e 5
+WHEEL_SEQUENCES = ("<MouseWheel>", "<Button-4>", "<Button-5>")
+WHEEL_COALESCE_MS = 16
+# Dimensione registrata per un allegato non accessibile
+MISSING_SIZE = -1
+# File selezionati dalla stessa cartella oltre i quali conviene leggerla tutta con scandir
+SCANDIR_MIN_FILES = 3
+
+
+class AttachmentList:
+    """
+    Allegati di una finestra in forma di array paralleli: percorsi, nomi file,
+    dimensioni (in un array int64 contiguo, MISSING_SIZE se il file non è accessibile),
+    etichette già formattate per la listbox e identità su disco (st_dev, st_ino)
+    usate per riconoscere lo stesso file scelto da percorsi diversi.
+    """
+
+    def __init__(self):
+        self.paths = []
+        self.names = []
+        self.sizes = array.array("q")
+        self.labels = []
+        self.identities = []
+        self._identity_set = set()
+        self._path_set = set()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def add(self, path) -> bool:
+        """Aggiunge un file se non è già presente; restituisce True se aggiunto."""
+        if path in self._path_set:
+            return False
+        size, identity = _stat_file(path)
+        if identity is not None:
+            if identity in self._identity_set:
+                return False
+            self._identity_set.add(identity)
+        name = os.path.basename(path)
+        self._path_set.add(path)
+        self.paths.append(path)
+        self.names.append(name)
+        self.sizes.append(size)
+        self.labels.append(_attachment_label(name, size))
+        self.identities.append(identity)
+        return True
+
+    def pop(self, index):
+        self._path_set.discard(self.paths.pop(index))
+        self.names.pop(index)
+        self.sizes.pop(index)
+        self.labels.pop(index)
+        self._identity_set.discard(self.identities.pop(index))
+
+    def clear(self):
+        self.paths.clear()
+        self._path_set.clear()
+        self.names.clear()
+        del self.sizes[:]
+        self.labels.clear()
+        self.identities.clear()
+        self._identity_set.clear()
+
+    def refresh_sizes(self):
+        """Rilegge dal disco tutte le dimensioni."""
+        sizes = _scan_sizes(self.paths)
+        self.sizes = array.array("q", (sizes.get(path, MISSING_SIZE) for path in self.paths))
+        self.labels = [_attachment_label(name, size) for name, size in zip(self.names, self.sizes)]
+
+    def total_size(self) -> int:
+        """Somma delle dimensioni dei file accessibili."""
+        # sum e count scorrono l'array in C; ogni MISSING_SIZE (-1) viene compensato
+        return sum(self.sizes) + self.sizes.count(MISSING_SIZE)
+
+
+_SIZE_UNITS = (("GB", 1 << 30), ("MB", 1 << 20))
+
+
+def _fmt_size(size: int) -> str:
+    """Formatta una dimensione in byte (sotto il MB si mostrano sempre i KB)."""
+    for unit, threshold in _SIZE_UNITS:
+        if size >= threshold:
+            return f"{size / threshold:.1f} {unit}"
+    return f"{size / 1024:.1f} KB"
+
+
+def _attachment_label(name: str, size: int) -> str:
+    if size == MISSING_SIZE:
+        return f"{name} (file non trovato)"
+    return f"{name} ({_fmt_size(size)})"
+
+
+def _stat_file(file_path):
+    """
+    Restituisce (dimensione, identità) con un solo stat; l'identità è
+    (st_dev, st_ino) oppure None se il file non è accessibile o il filesystem
+    non fornisce un inode.
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return MISSING_SIZE, None
+    identity = (st.st_dev, st.st_ino) if st.st_ino else None
+    return st.st_size, identity
+
+
+def _scan_sizes(paths):
+    """
+    Legge le dimensioni dei file raggruppandoli per cartella. Solo le cartelle
+    con almeno SCANDIR_MIN_FILES file selezionati vengono lette con os.scandir
+    (una lettura della directory, DirEntry.stat() su Windows già in cache);
+    per le altre basta un os.stat per file, senza elencare cartelle grandi.
+    I file non trovati sono assenti dal dizionario restituito.
+    """
+    per_cartella = {}
+    for path in paths:
+        cartella, nome = os.path.split(path)
+        per_cartella.setdefault(cartella, {})[nome] = path
+
+    sizes = {}
+    for cartella, nomi in per_cartella.items():
+        if len(nomi) < SCANDIR_MIN_FILES:
+            for path in nomi.values():
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    sizes[path] = st.st_size
+            continue
+        try:
+            with os.scandir(cartella or ".") as entries:
+                for entry in entries:
+                    path = nomi.get(entry.name)
+                    if path is not None and entry.is_file():
+                        sizes[path] = entry.stat().st_size
+        except OSError:
+            continue
+    return sizes
 
 def avvia_gui():
+    attachments = AttachmentList()
+
     root = tk.Tk()
+    # La finestra resta nascosta durante la costruzione: un solo layout al termine
+    root.withdraw()
     root.title("Email Tester - SMTP/API con Token")
     root.geometry("900x700")
     root.resizable(True, True)
     root.minsize(800, 600)
 
+    # Gli invii (I/O bloccante) girano fuori dal thread Tk
+    executor = ThreadPoolExecutor(max_workers=2)
+    # Futures non ancora terminati: alla chiusura quelli in attesa vengono annullati
+    pending_futures = set()
+    closing = [False]
+
     # Variabili controllate da Tk
     var_token_required = tk.BooleanVar(value=False)
     var_starttls_25 = tk.BooleanVar(value=False)
@@ -43,21 +200,76 @@ def avvia_gui():
 
     canvas = tk.Canvas(main_container, highlightthickness=0)
     scrollbar = ttk.Scrollbar(main_container, orient="vertical", command=canvas.yview)
+    # Il frame deve essere figlio del canvas: solo così la finestra incorporata
+    # viene ritagliata dal canvas e il canvas riceve <Enter>/<Leave>
     scrollable_frame = ttk.Frame(canvas)
 
-    scrollable_frame.bind(
-        "<Configure>",
-        lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-    )
+    # Il ricalcolo della scrollregion è raggruppato: un solo bbox ogni 50 ms
+    _resize_job = [None]
+    _last_bbox = [None]
+
+    def _update_scrollregion():
+        _resize_job[0] = None
+        bbox = canvas.bbox("all")
+        if bbox != _last_bbox[0]:
+            _last_bbox[0] = bbox
+            canvas.configure(scrollregion=bbox)
+
+    def _on_frame_configure(_event):
+        if _resize_job[0] is not None:
+            canvas.after_cancel(_resize_job[0])
+        _resize_job[0] = canvas.after(50, _update_scrollregion)
+
+    scrollable_frame.bind("<Configure>", _on_frame_configure)
 
     canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
     canvas.configure(yscrollcommand=scrollbar.set)
 
-    # Bind mousewheel per scrolling
+    # Bind mousewheel per scrolling, attivo solo con il puntatore sopra il canvas.
+    # Gli eventi che arrivano entro WHEEL_COALESCE_MS sono accumulati e applicati
+    # con un solo yview_scroll (un ridisegno per frame anche con touchpad veloci)
+    _wheel_accum = [0]
+    _wheel_job = [None]
+
+    def _flush_wheel():
+        _wheel_job[0] = None
+        step, _wheel_accum[0] = _wheel_accum[0], 0
+        if not step or not canvas.winfo_exists():
+            return
+        bbox = canvas.bbox("all")
+        if bbox is None or bbox[3] <= canvas.winfo_height():
+            return
+        canvas.yview_scroll(step, "units")
+
     def _on_mousewheel(event):
-        canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-    
-    canvas.bind_all("<MouseWheel>", _on_mousewheel)
+        # Text e Listbox hanno già il proprio scroll
+        if isinstance(event.widget, (tk.Text, tk.Listbox)):
+            return
+        if event.num == 4:
+            _wheel_accum[0] -= 1
+        elif event.num == 5:
+            _wheel_accum[0] += 1
+        else:
+            _wheel_accum[0] += int(-1*(event.delta/120))
+        if _wheel_job[0] is None:
+            _wheel_job[0] = root.after(WHEEL_COALESCE_MS, _flush_wheel)
+
+    def _bind_mousewheel(_event):
+        for sequence in WHEEL_SEQUENCES:
+            canvas.bind_all(sequence, _on_mousewheel)
+
+    def _unbind_mousewheel(_event):
+        # <Leave> arriva anche entrando nei widget figli: si sgancia solo se il
+        # puntatore è davvero uscito dall'area del canvas
+        x, y = canvas.winfo_pointerxy()
+        left, top = canvas.winfo_rootx(), canvas.winfo_rooty()
+        if left <= x < left + canvas.winfo_width() and top <= y < top + canvas.winfo_height():
+            return
+        for sequence in WHEEL_SEQUENCES:
+            canvas.unbind_all(sequence)
+
+    canvas.bind("<Enter>", _bind_mousewheel)
+    canvas.bind("<Leave>", _unbind_mousewheel)
 
     canvas.pack(side="left", fill="both", expand=True)
     scrollbar.pack(side="right", fill="y")
@@ -176,26 +388,18 @@ def avvia_gui():
         auth_method = var_auth_method.get()
         token_required = var_token_required.get()
 
-        # Reset stati
-        widgets_smtp = [entry_username, entry_password]
-        widgets_api = [entry_api_key, entry_api_secret, check_token_req]
-        widgets_token = [entry_url_token]
-        widgets_api_url = [entry_url_send]
-
-        for widget in widgets_smtp + widgets_api + widgets_token + widgets_api_url:
-            widget.config(state="disabled")
-
-        if auth_method == "smtp":
-            for widget in widgets_smtp:
-                widget.config(state="normal")
-        elif auth_method == "api":
-            for widget in widgets_api:
-                widget.config(state="normal")
-            for widget in widgets_api_url:
-                widget.config(state="normal")
-            if token_required:
-                for widget in widgets_token:
-                    widget.config(state="normal")
+        # Ogni widget riceve un solo cambio di stato (niente disabilita-tutto
+        # e poi riabilita): lo stato ttk non si propaga ai figli di un Frame,
+        # quindi i gruppi sono semplici tuple di widget
+        groups = (
+            ((entry_username, entry_password), auth_method == "smtp"),
+            ((entry_api_key, entry_api_secret, check_token_req, entry_url_send), auth_method == "api"),
+            ((entry_url_token,), auth_method == "api" and token_required),
+        )
+        for widgets, enabled in groups:
+            state = ["!disabled"] if enabled else ["disabled"]
+            for widget in widgets:
+                widget.state(state)
 
     # Radio buttons per metodo autenticazione
     auth_method_frame = ttk.Frame(auth_frame)
@@ -257,10 +461,14 @@ def avvia_gui():
         )
         if file_paths:
             for file_path in file_paths:
-                if file_path not in attachments:
-                    attachments.append(file_path)
+                attachments.add(file_path)
             update_attachments_display()
 
+    def refresh_sizes():
+        """Rilegge dal disco le dimensioni degli allegati (se i file sono cambiati)."""
+        attachments.refresh_sizes()
+        update_attachments_display()
+
     def remove_selected_attachment():
         """Rimuove l'allegato selezionato."""
         selection = listbox_attachments.curselection()
@@ -279,21 +487,22 @@ def avvia_gui():
 
     def update_attachments_display():
         """Aggiorna la visualizzazione degli allegati."""
+        items = attachments.labels
+
+        # Un solo delete + insert verso Tcl; per liste molto lunghe si rimuove
+        # temporaneamente la listbox dalla griglia per evitare ricalcoli intermedi
+        large = len(items) > LARGE_LIST_THRESHOLD
+        if large:
+            listbox_attachments.grid_remove()
         listbox_attachments.delete(0, tk.END)
-        total_size = 0
-        for file_path in attachments:
-            filename = os.path.basename(file_path)
-            try:
-                size = os.path.getsize(file_path)
-                total_size += size
-                size_str = f"{size/1024:.1f} KB" if size < 1024*1024 else f"{size/(1024*1024):.1f} MB"
-                listbox_attachments.insert(tk.END, f"{filename} ({size_str})")
-            except:
-                listbox_attachments.insert(tk.END, f"{filename} (file non trovato)")
+        if items:
+            listbox_attachments.insert(tk.END, *items)
+        if large:
+            listbox_attachments.grid()
         
+        total_size = attachments.total_size()
         if total_size > 0:
-            total_str = f"{total_size/1024:.1f} KB" if total_size < 1024*1024 else f"{total_size/(1024*1024):.1f} MB"
-            lbl_total_size.config(text=f"Dimensione totale: {total_str}")
+            lbl_total_size.config(text=f"Dimensione totale: {_fmt_size(total_size)}")
         else:
             lbl_total_size.config(text="")
 
@@ -303,7 +512,8 @@ def avvia_gui():
     
     ttk.Button(attachments_buttons, text="Aggiungi File", command=attach_file).pack(side="left", padx=(0, 5))
     ttk.Button(attachments_buttons, text="Rimuovi Selezionato", command=remove_selected_attachment).pack(side="left", padx=(0, 5))
-    ttk.Button(attachments_buttons, text="Rimuovi Tutti", command=remove_all_attachments).pack(side="left")
+    ttk.Button(attachments_buttons, text="Rimuovi Tutti", command=remove_all_attachments).pack(side="left", padx=(0, 5))
+    ttk.Button(attachments_buttons, text="Ricarica", command=refresh_sizes).pack(side="left")
 
     # Listbox per allegati
     attachments_list_frame = ttk.Frame(attachments_frame)
@@ -334,7 +544,7 @@ def avvia_gui():
     ttk.Label(multi_frame, text=f"(min {MIN_DELAY_SECONDS}s)", foreground="gray").grid(row=0, column=4, padx=(8, 0))
 
     def test_connection():
-        """Testa la connessione al server SMTP."""
+        """Testa la connessione al server SMTP; se riesce la connessione resta nel pool per l'invio."""
         smtp_server = entry_smtp_server.get().strip()
         smtp_port = entry_port.get().strip()
         
@@ -348,58 +558,99 @@ def avvia_gui():
             lbl_result.config(text="❌ La porta deve essere un numero", foreground="red")
             return
 
-        try:
+        modalita = modalita_smtp(var_smtps_465.get(), var_starttls_25.get() or var_starttls_587.get())
+        # Stesse credenziali (e quindi stessa chiave del pool) usate da invia_email:
+        # con autenticazione SMTP il test esegue anche il login.
+        login = entry_username.get().strip() if var_auth_method.get() == "smtp" else ""
+        password = entry_password.get().strip() if login else ""
+        if login:
+            lbl_result.config(text="🔄 Test connessione e login in corso...", foreground="blue")
+        else:
             lbl_result.config(text="🔄 Test connessione in corso...", foreground="blue")
-            root.update()
-            
-            if var_smtps_465.get():
-                server = smtplib.SMTP_SSL(smtp_server, smtp_port, timeout=10)
-            else:
-                server = smtplib.SMTP(smtp_server, smtp_port, timeout=10)
-                if var_starttls_25.get() or var_starttls_587.get():
-                    server.starttls()
-            
-            server.ehlo()
-            server.quit()
-            lbl_result.config(text="✅ Connessione al server riuscita!", foreground="green")
-        except Exception as e:
-            lbl_result.config(text=f"❌ Errore di connessione: {str(e)}", foreground="red")
+        btn_test.state(["disabled"])
+        # Handshake e login sono I/O di rete: girano nel thread pool come gli invii
+        _submit(_apply_test_result, _esegui_test_connessione, smtp_server, smtp_port, modalita, login, password)
 
-    def validate_form():
+    def _esegui_test_connessione(smtp_server, smtp_port, modalita, login, password):
+        try:
+            server = apri_connessione_smtp(smtp_server, smtp_port, modalita, login, password, timeout=10)
+        except Exception as e:
+            return False, f"❌ Errore di connessione: {str(e)}"
+        rilascia_connessione_smtp(server, smtp_server, smtp_port, modalita, login, password)
+        if login:
+            return True, "✅ Connessione e login al server riusciti!"
+        return True, "✅ Connessione al server riuscita!"
+
+    def _apply_test_result(riuscito, messaggio):
+        btn_test.state(["!disabled"])
+        lbl_result.config(text=messaggio, foreground="green" if riuscito else "red")
+
+    def _snapshot_form() -> dict:
+        """
+        Legge una sola volta i campi del form, con le chiavi di invia_email.
+        Corpo e allegati sono copiati qui, così gli invii multipli non rileggono
+        il widget Text ad ogni iterazione.
+        """
+        return {
+            "sender": entry_from.get().strip(),
+            "recipient": entry_to.get().strip(),
+            "cc": entry_cc.get().strip(),
+            "bcc": entry_bcc.get().strip(),
+            "subject": entry_subject.get().strip(),
+            "nickname": entry_nickname.get().strip(),
+            "smtp_server": entry_smtp_server.get().strip(),
+            "smtp_port": entry_port.get().strip(),
+            "username": entry_username.get().strip(),
+            "password": entry_password.get().strip(),
+            "url_token": entry_url_token.get().strip(),
+            "url_send": entry_url_send.get().strip(),
+            "api_key": entry_api_key.get().strip(),
+            "api_secret": entry_api_secret.get().strip(),
+            "starttls_25": var_starttls_25.get(),
+            "starttls_587": var_starttls_587.get(),
+            "smtps_465": var_smtps_465.get(),
+            "auth_method": var_auth_method.get(),
+            "token_required": var_token_required.get(),
+            "body_format": body_format.get(),
+            "body": text_body.get("1.0", tk.END).strip(),
+            "attachments": tuple(attachments.paths),
+        }
+
+    def validate_form(snapshot: dict):
         """Valida i dati del form prima dell'invio."""
         errors = []
 
-        auth_method = var_auth_method.get()
-        if not entry_from.get().strip():
+        auth_method = snapshot["auth_method"]
+        if not snapshot["sender"]:
             errors.append("Mittente richiesto")
-        if not entry_to.get().strip():
+        if not snapshot["recipient"]:
             errors.append("Destinatario richiesto")
 
         valido_email, msg_email = valida_email_indirizzi(
-            entry_from.get().strip(),
-            entry_to.get().strip(),
-            entry_cc.get().strip(),
-            entry_bcc.get().strip(),
+            snapshot["sender"],
+            snapshot["recipient"],
+            snapshot["cc"],
+            snapshot["bcc"],
         )
         if not valido_email:
             errors.append(msg_email)
 
         if auth_method in ("smtp", "none"):
-            if not entry_smtp_server.get().strip():
+            if not snapshot["smtp_server"]:
                 errors.append("Server SMTP richiesto")
-            if not entry_port.get().strip():
+            if not snapshot["smtp_port"]:
                 errors.append("Porta richiesta")
 
         if auth_method == "smtp":
-            if not entry_username.get().strip() or not entry_password.get().strip():
+            if not snapshot["username"] or not snapshot["password"]:
                 errors.append("Username e password richiesti per SMTP")
         elif auth_method == "api":
-            if not entry_url_send.get().strip():
+            if not snapshot["url_send"]:
                 errors.append("URL Send richiesto per invio API")
-            if var_token_required.get():
-                if not entry_api_key.get().strip() or not entry_api_secret.get().strip():
+            if snapshot["token_required"]:
+                if not snapshot["api_key"] or not snapshot["api_secret"]:
                     errors.append("API Key e Secret richiesti quando è necessario il token")
-                if not entry_url_token.get().strip():
+                if not snapshot["url_token"]:
                     errors.append("URL Token richiesto per ottenere il token")
 
         try:
@@ -416,57 +667,66 @@ def avvia_gui():
 
         return errors
 
-    def perform_send_once():
-        return invia_email(
-            sender=entry_from.get().strip(),
-            recipient=entry_to.get().strip(),
-            cc=entry_cc.get().strip(),
-            bcc=entry_bcc.get().strip(),
-            subject=entry_subject.get().strip(),
-            body=text_body.get("1.0", tk.END).strip(),
-            nickname=entry_nickname.get().strip(),
-            smtp_server=entry_smtp_server.get().strip(),
-            smtp_port=entry_port.get().strip(),
-            username=entry_username.get().strip(),
-            password=entry_password.get().strip(),
-            url_token=entry_url_token.get().strip(),
-            url_send=entry_url_send.get().strip(),
-            api_key=entry_api_key.get().strip(),
-            api_secret=entry_api_secret.get().strip(),
-            starttls_25=var_starttls_25.get(),
-            starttls_587=var_starttls_587.get(),
-            smtps_465=var_smtps_465.get(),
-            auth_method=var_auth_method.get(),
-            token_required=var_token_required.get(),
-            body_format=body_format.get(),
-            attachments=attachments
-        )
+    def perform_send_once(snapshot: dict, on_done):
+        """
+        Avvia un invio nel thread pool a partire dallo snapshot del form;
+        on_done(status, risultato) viene eseguito sul thread Tk al termine.
+        """
+        _submit(on_done, invia_email, **snapshot)
+
+    def _submit(on_done, fn, *args, **kwargs):
+        """Esegue fn nel thread pool e riporta (status, risultato) a on_done sul thread Tk."""
+        future = executor.submit(fn, *args, **kwargs)
+        pending_futures.add(future)
+        future.add_done_callback(lambda f: _deliver(f, on_done))
+
+    def _deliver(future, on_done):
+        pending_futures.discard(future)
+        if closing[0] or future.cancelled():
+            return
+        try:
+            root.after(0, on_done, *_future_result(future))
+        except (RuntimeError, tk.TclError):
+            # La finestra è stata chiusa mentre l'operazione era in corso
+            pass
+
+    def _future_result(future):
+        try:
+            return future.result()
+        except Exception as e:
+            return SendStatus.SMTP_ERR, f"Errore durante l'invio: {str(e)}"
 
-    def validate_before_send() -> bool:
-        errors = validate_form()
+    def validate_before_send():
+        """Valida il form e restituisce lo snapshot dei campi, o None se l'invio va annullato."""
+        snapshot = _snapshot_form()
+        errors = validate_form(snapshot)
         if errors:
             messagebox.showerror("Errori di validazione", "\n".join(f"• {error}" for error in errors))
-            return False
+            return None
 
         # Conferma invio se ci sono allegati pesanti
-        total_size = sum(os.path.getsize(f) for f in attachments if os.path.exists(f))
+        total_size = attachments.total_size()
         if total_size > 10 * 1024 * 1024:  # 10 MB
-            if not messagebox.askyesno("Conferma", f"Gli allegati pesano {total_size/(1024*1024):.1f} MB. Continuare?"):
-                return False
-        return True
+            if not messagebox.askyesno("Conferma", f"Gli allegati pesano {_fmt_size(total_size)}. Continuare?"):
+                return None
+        return snapshot
 
     def send_email():
         """Invia una singola email."""
-        if not validate_before_send():
+        snapshot = validate_before_send()
+        if snapshot is None:
             return
 
         lbl_result.config(text="📤 Invio in corso...", foreground="blue")
-        root.update()
+        set_send_buttons_state(False)
+        perform_send_once(snapshot, _apply_result)
 
-        risultato = perform_send_once()
+    def _apply_result(status, risultato):
+        """Mostra l'esito di un invio singolo."""
+        set_send_buttons_state(True)
 
         # Visualizzazione risultato
-        if "successo" in risultato.lower():
+        if status is SendStatus.OK:
             lbl_result.config(text=f"✅ {risultato}", foreground="green")
             if messagebox.askyesno("Successo", f"{risultato}\n\nVuoi pulire il form?"):
                 clear_form()
@@ -476,7 +736,8 @@ def avvia_gui():
 
     def send_multiple():
         """Esegue invii multipli con attesa configurabile."""
-        if not validate_before_send():
+        snapshot = validate_before_send()
+        if snapshot is None:
             return
 
         try:
@@ -498,22 +759,46 @@ def avvia_gui():
             messagebox.showerror("Errore", f"Il tempo di attesa minimo è {MIN_DELAY_SECONDS} secondi")
             return
 
-        successi = 0
-        falliti = []
+        stato = {
+            "index": 0,
+            "total": total,
+            "delay_ms": int(delay * 1000),
+            "successi": 0,
+            "falliti": [],
+            # I campi non cambiano durante la campagna: letti una sola volta
+            "snapshot": snapshot,
+        }
+        set_send_buttons_state(False)
+        _schedule_send(stato)
+
+    def _schedule_send(stato):
+        """Esegue un singolo invio della campagna e pianifica il successivo con root.after."""
+        index = stato["index"]
+        total = stato["total"]
+
+        lbl_result.config(text=f"📤 Invio {index + 1}/{total}...", foreground="blue")
+        perform_send_once(stato["snapshot"], lambda status, risultato: _on_multi_result(stato, status, risultato))
+
+    def _on_multi_result(stato, status, risultato):
+        """Registra l'esito di un invio della campagna e pianifica il successivo."""
+        index = stato["index"]
+        if status is SendStatus.OK:
+            stato["successi"] += 1
+        else:
+            stato["falliti"].append(f"#{index + 1}: {risultato}")
 
-        for index in range(total):
-            lbl_result.config(text=f"📤 Invio {index + 1}/{total}...", foreground="blue")
-            root.update()
-            risultato = perform_send_once()
-            if "successo" in risultato.lower():
-                successi += 1
-            else:
-                falliti.append(f"#{index + 1}: {risultato}")
+        if index + 1 < stato["total"]:
+            stato["index"] = index + 1
+            root.after(stato["delay_ms"], lambda: _schedule_send(stato))
+        else:
+            _show_multi_summary(stato)
 
-            if index < total - 1:
-                time.sleep(delay)
+    def _show_multi_summary(stato):
+        """Mostra il riepilogo al termine degli invii multipli."""
+        set_send_buttons_state(True)
+        falliti = stato["falliti"]
 
-        summary = f"Inviate {successi} email su {total}."
+        summary = f"Inviate {stato['successi']} email su {stato['total']}."
         if falliti:
             summary += "\n\nErrori:\n" + "\n".join(falliti)
 
@@ -524,6 +809,12 @@ def avvia_gui():
             lbl_result.config(text=f"✅ {summary}", foreground="green")
             messagebox.showinfo("Invio multiplo", summary)
 
+    def set_send_buttons_state(enabled: bool):
+        """Abilita o disabilita i pulsanti di invio mentre un invio è in corso."""
+        state = ["!disabled"] if enabled else ["disabled"]
+        btn_send.state(state)
+        btn_send_multiple.state(state)
+
     def clear_form():
         """Pulisce tutti i campi del form."""
         entry_from.delete(0, tk.END)
@@ -541,9 +832,12 @@ def avvia_gui():
     actions_buttons = ttk.Frame(actions_frame)
     actions_buttons.pack(pady=10)
 
-    ttk.Button(actions_buttons, text="🔍 Test Connessione", command=test_connection).pack(side="left", padx=(0, 10))
-    ttk.Button(actions_buttons, text="📧 Invia Email", command=send_email).pack(side="left", padx=(0, 10))
-    ttk.Button(actions_buttons, text="📨 Invio Multiplo", command=send_multiple).pack(side="left", padx=(0, 10))
+    btn_test = ttk.Button(actions_buttons, text="🔍 Test Connessione", command=test_connection)
+    btn_test.pack(side="left", padx=(0, 10))
+    btn_send = ttk.Button(actions_buttons, text="📧 Invia Email", command=send_email)
+    btn_send.pack(side="left", padx=(0, 10))
+    btn_send_multiple = ttk.Button(actions_buttons, text="📨 Invio Multiplo", command=send_multiple)
+    btn_send_multiple.pack(side="left", padx=(0, 10))
     ttk.Button(actions_buttons, text="🗑️ Pulisci Form", command=clear_form).pack(side="left")
 
     # Label risultato
@@ -557,4 +851,28 @@ def avvia_gui():
     # Focus sul primo campo
     entry_from.focus()
 
+    root.update_idletasks()
+    required_height = scrollable_frame.winfo_reqheight() + 20  # pady del contenitore
+    if required_height <= root.winfo_screenheight() - 100:
+        # Il form entra nello schermo: niente scrollbar, scrollregion né rotella.
+        # Il canvas resta solo come contenitore (un widget Tk non può cambiare
+        # genitore) e la finestra viene dimensionata sul contenuto
+        scrollable_frame.unbind("<Configure>")
+        if _resize_job[0] is not None:
+            canvas.after_cancel(_resize_job[0])
+            _resize_job[0] = None
+        canvas.unbind("<Enter>")
+        canvas.unbind("<Leave>")
+        canvas.configure(yscrollcommand="", height=scrollable_frame.winfo_reqheight())
+        scrollbar.destroy()
+        root.geometry(f"900x{max(required_height, 600)}")
+        # Senza scrollbar la finestra non deve diventare più bassa del form
+        root.minsize(900, max(required_height, 600))
+
+    root.deiconify()
     root.mainloop()
+    closing[0] = True
+    # cancel_futures di shutdown esiste solo da Python 3.9: annullo a mano
+    for future in list(pending_futures):
+        future.cancel()
+    executor.shutdown(wait=False)
@@ -1,5 +1,7 @@
 import unittest
+from unittest import mock
 
+import email_service
 from email_service import valida_email_indirizzi, _normalizza_lista_email
 
 
@@ -33,5 +35,83 @@ class TestEmailValidation(unittest.TestCase):
         self.assertEqual(emails, ["a@example.com", "b@example.com"])
 
 
+class TestInviaEmailStatus(unittest.TestCase):
+    def test_validation_error_status(self):
+        status, msg = email_service.invia_email(
+            "", "dest@example.com", "", "", "", "", "", "smtp.example.com", 587,
+            "", "", "", "", "", "", False, True, False, "none", False, "plain", [],
+        )
+        self.assertIs(status, email_service.SendStatus.VALIDATION_ERR)
+        self.assertIn("obbligatori", msg)
+
+
+class TestSmtpPool(unittest.TestCase):
+    def tearDown(self):
+        email_service.chiudi_connessioni_smtp()
+
+    def test_connection_is_reused(self):
+        with mock.patch.object(email_service.smtplib, "SMTP") as smtp_cls:
+            smtp_cls.return_value.noop.return_value = (250, b"OK")
+            first = email_service.apri_connessione_smtp("smtp.example.com", 25, "plain")
+            email_service.rilascia_connessione_smtp(first, "smtp.example.com", 25, "plain")
+            second = email_service.apri_connessione_smtp("smtp.example.com", 25, "plain")
+
+        self.assertIs(first, second)
+        self.assertEqual(smtp_cls.call_count, 1)
+
+    def test_expired_connection_is_replaced(self):
+        with mock.patch.object(email_service.smtplib, "SMTP") as smtp_cls, \
+                mock.patch.object(email_service, "SMTP_CACHE_TTL_SECONDS", 0):
+            first = email_service.apri_connessione_smtp("smtp.example.com", 25, "plain")
+            email_service.rilascia_connessione_smtp(first, "smtp.example.com", 25, "plain")
+            email_service.apri_connessione_smtp("smtp.example.com", 25, "plain")
+
+        self.assertEqual(smtp_cls.call_count, 2)
+        first.quit.assert_called_once()
+
+    def test_changed_password_is_not_reused(self):
+        with mock.patch.object(email_service.smtplib, "SMTP") as smtp_cls:
+            smtp_cls.side_effect = lambda *args, **kwargs: mock.Mock(noop=mock.Mock(return_value=(250, b"OK")))
+            first = email_service.apri_connessione_smtp("smtp.example.com", 587, "plain", "user", "giusta")
+            email_service.rilascia_connessione_smtp(first, "smtp.example.com", 587, "plain", "user", "giusta")
+            second = email_service.apri_connessione_smtp("smtp.example.com", 587, "plain", "user", "sbagliata")
+
+        self.assertIsNot(first, second)
+        self.assertEqual(smtp_cls.call_count, 2)
+        second.login.assert_called_once_with("user", "sbagliata")
+
+
+class TestBulkApi(unittest.TestCase):
+    def test_bulk_chunks_recipients(self):
+        response = mock.Mock(status_code=202)
+        recipients = [f"user{i}@example.com" for i in range(3)]
+        with mock.patch.object(email_service, "API_BULK_CHUNK_SIZE", 2), \
+                mock.patch.object(email_service._HTTP, "post", return_value=response) as post:
+            status, _ = email_service.invia_email_api_bulk(
+                "https://api.example.com/send", {}, "sender@example.com",
+                recipients, "Oggetto", "Corpo", "", "plain", [],
+            )
+
+        self.assertIs(status, email_service.SendStatus.OK)
+        self.assertEqual(post.call_count, 2)
+        sent = [
+            p["to"][0]["email"]
+            for call in post.call_args_list
+            for p in call.kwargs["json"]["personalizations"]
+        ]
+        self.assertEqual(sent, recipients)
+
+    def test_messaggio_errore_api(self):
+        response = mock.Mock(status_code=400)
+        response.json.return_value = {"error": "bad request"}
+        self.assertEqual(
+            email_service._messaggio_errore_api(response), "Errore API: 400 - bad request"
+        )
+
+        response.json.side_effect = ValueError
+        response.text = ""
+        self.assertEqual(email_service._messaggio_errore_api(response), "Errore API: 400")
+
+
 if __name__ == "__main__":
     unittest.main()
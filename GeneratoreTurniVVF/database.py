@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-import re
+import functools
 import sqlite3
+import string
+import sys
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from datetime import date, datetime
+from datetime import date
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 from vvf_scheduler.rules import (
     GenerationRuleConfig,
@@ -33,20 +37,216 @@ ROLE_AUTISTA = "AUTISTA"
 ROLE_VIGILE = "VIGILE"
 ROLE_AUTISTA_VIGILE = "AUTISTA+VIGILE"
 
+# Impostazioni il cui valore è il nome di una persona.
+PERSON_SETTING_KEYS: Tuple[str, ...] = (
+    "autista_varchi",
+    "autista_pogliani",
+    "vigile_escluso_estate",
+)
+
+# Statement SQL a livello di modulo: stessa stringa a ogni chiamata, sempre servita dalla cache
+# dei prepared statement della connessione (vedi cached_statements in Database.__init__).
+_SCHEMA_TABLES = ("people", "settings", "forbidden_pairs", "preferred_pairs", "vacations")
+# Colonne aggiunte dopo la prima versione dello schema (migrate da _ensure_schema).
+_COLUMN_MIGRATIONS: Dict[str, List[Tuple[str, str]]] = {
+    "people": [
+        ("first_name", "TEXT"),
+        ("last_name", "TEXT"),
+        ("phone", "TEXT"),
+        ("email", "TEXT"),
+        ("ruolo", "TEXT DEFAULT ''"),
+        ("grado", "TEXT"),
+        ("weekly_cap", f"INTEGER DEFAULT {DEFAULT_WEEKLY_CAP}"),
+        ("rest_hours", "INTEGER NOT NULL DEFAULT 0"),
+    ],
+    "forbidden_pairs": [("is_hard", "INTEGER NOT NULL DEFAULT 1")],
+    "preferred_pairs": [("is_hard", "INTEGER NOT NULL DEFAULT 0")],
+}
+_SQL_TABLE_COLUMNS = "SELECT name FROM pragma_table_info(?)"
+_SQL_GET_SETTING = "SELECT value FROM settings WHERE key = ?"
+_SQL_ALL_SETTINGS = "SELECT key, value FROM settings"
+_SQL_SET_SETTING = """
+INSERT INTO settings (key, value)
+VALUES (?, ?)
+ON CONFLICT(key) DO UPDATE SET value = excluded.value
+"""
+_SQL_DELETE_SETTING = "DELETE FROM settings WHERE key = ?"
+_SQL_CLEAR_PERSON_SETTINGS = (
+    "DELETE FROM settings WHERE key IN ({}) AND value = ?".format(
+        ", ".join("?" for _ in PERSON_SETTING_KEYS)
+    )
+)
+_SQL_LOAD_RULE_SETTINGS = "SELECT key, value FROM settings WHERE key LIKE 'rule.%'"
+_SQL_LIST_PEOPLE = "SELECT * FROM people ORDER BY id"
+_SQL_LOAD_PEOPLE = """
+SELECT id, name, first_name, last_name, phone, email, ruolo, grado,
+       is_autista, is_vigile, livello, weekly_cap, rest_hours
+FROM people
+ORDER BY id
+"""
+_SQL_UPDATE_PERSON = """
+UPDATE people
+SET name = ?, first_name = ?, last_name = ?, phone = ?, email = ?, ruolo = ?, grado = ?,
+    is_autista = ?, is_vigile = ?, livello = ?, weekly_cap = ?, rest_hours = ?
+WHERE id = ?
+"""
+_SQL_UPDATE_PERSON_RETURNING = _SQL_UPDATE_PERSON + "RETURNING *\n"
+# RETURNING richiede SQLite 3.35: con librerie più vecchie rileggo la riga con una SELECT.
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+_SQL_GET_PERSON = "SELECT * FROM people WHERE id = ?"
+_SQL_GET_PERSON_ID = "SELECT id FROM people WHERE name = ? COLLATE NOCASE"
+# Forma fissa a 13 parametri posizionali (name, rename, first_name, last_name, phone, email,
+# ruolo, grado, is_autista, is_vigile, livello, weekly_cap, rest_hours): lo stesso valore fa da
+# default in INSERT e, se non NULL, da aggiornamento. rename NULL lascia invariato il nome.
+_SQL_UPSERT_PERSON = f"""
+INSERT INTO people (name, first_name, last_name, phone, email, ruolo, grado,
+                    is_autista, is_vigile, livello, weekly_cap, rest_hours)
+VALUES (?1, COALESCE(?3, ''), COALESCE(?4, ''), COALESCE(?5, ''), COALESCE(?6, ''),
+        COALESCE(?7, ''), COALESCE(?8, ''), COALESCE(?9, 0), COALESCE(?10, 0),
+        COALESCE(NULLIF(?11, ''), 'JUNIOR'), COALESCE(?12, {DEFAULT_WEEKLY_CAP}), COALESCE(?13, 0))
+ON CONFLICT(name) DO UPDATE SET
+    name = COALESCE(?2, name),
+    first_name = COALESCE(?3, first_name),
+    last_name = COALESCE(?4, last_name),
+    phone = COALESCE(?5, phone),
+    email = COALESCE(?6, email),
+    ruolo = COALESCE(?7, ruolo),
+    grado = COALESCE(?8, grado),
+    is_autista = COALESCE(?9, is_autista),
+    is_vigile = COALESCE(?10, is_vigile),
+    livello = COALESCE(?11, livello),
+    weekly_cap = COALESCE(?12, weekly_cap),
+    rest_hours = COALESCE(?13, rest_hours)
+-- Riga già identica: nessuna scrittura (né RETURNING). Il nome è confrontato in BINARY
+-- perché un cambio di sole maiuscole conta come modifica.
+WHERE name COLLATE BINARY IS NOT COALESCE(?2, name)
+   OR first_name IS NOT COALESCE(?3, first_name)
+   OR last_name IS NOT COALESCE(?4, last_name)
+   OR phone IS NOT COALESCE(?5, phone)
+   OR email IS NOT COALESCE(?6, email)
+   OR ruolo IS NOT COALESCE(?7, ruolo)
+   OR grado IS NOT COALESCE(?8, grado)
+   OR is_autista IS NOT COALESCE(?9, is_autista)
+   OR is_vigile IS NOT COALESCE(?10, is_vigile)
+   OR livello IS NOT COALESCE(?11, livello)
+   OR weekly_cap IS NOT COALESCE(?12, weekly_cap)
+   OR rest_hours IS NOT COALESCE(?13, rest_hours)
+"""
+_SQL_LOAD_IMPORT_STATE = """
+SELECT name, first_name, last_name, ruolo, grado, is_autista, is_vigile, livello, weekly_cap
+FROM people
+"""
+_SQL_UPSERT_PERSON_RETURNING_ID = _SQL_UPSERT_PERSON + "RETURNING id\n"
+_SQL_UPSERT_FORBIDDEN_PAIR = """
+INSERT INTO forbidden_pairs (first_id, second_id, is_hard)
+VALUES (?, ?, ?)
+ON CONFLICT(first_id, second_id) DO UPDATE SET is_hard = excluded.is_hard
+"""
+_SQL_LIST_FORBIDDEN_PAIRS = "SELECT first_id, second_id, COALESCE(is_hard, 1) AS is_hard FROM forbidden_pairs ORDER BY first_id, second_id"
+_SQL_UPSERT_PREFERRED_PAIR = """
+INSERT INTO preferred_pairs (autista_id, vigile_id, is_hard)
+VALUES (?, ?, ?)
+ON CONFLICT(autista_id, vigile_id) DO UPDATE SET is_hard = excluded.is_hard
+"""
+_SQL_LIST_PREFERRED_PAIRS = "SELECT autista_id, vigile_id, COALESCE(is_hard, 0) AS is_hard FROM preferred_pairs ORDER BY autista_id, vigile_id"
+_SQL_INSERT_VACATION = """
+INSERT INTO vacations (person_id, start_date, end_date, note)
+VALUES (?, ?, ?, ?)
+"""
+_SQL_LOAD_VACATIONS = "SELECT person_id, start_date, end_date, note FROM vacations ORDER BY start_date"
+
+
+# Stessa piegatura di COLLATE NOCASE (solo ASCII), per indicizzare i nomi come fa SQLite.
+_NOCASE_FOLD = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
 
 def _normalize_whitespace(value: str) -> str:
     """Strip leading/trailing spaces and compress internal whitespace."""
-    return re.sub(r"\s+", " ", value).strip()
+    # str.split() senza argomenti divide su tutti gli spazi Unicode, come \s+.
+    return " ".join(value.split()) if value else ""
 
 
+@functools.lru_cache(maxsize=1024)
+def _split_full_name(full_name: str) -> Tuple[str, str]:
+    """Divido "Nome Cognome ..." in (nome, cognome); i nomi si ripetono tra import successivi."""
+    chunks = full_name.split()
+    if len(chunks) >= 2:
+        return chunks[0], " ".join(chunks[1:])
+    return full_name, ""
+
+
+@functools.lru_cache(maxsize=1024)
 def _parse_date(value: str) -> date:
-    return datetime.strptime(value, "%Y-%m-%d").date()
+    # Formato fisso YYYY-MM-DD: split + int evita strptime; le date ripetute arrivano dalla cache.
+    year, month, day = value.split("-")
+    return date(int(year), int(month), int(day))
 
 
 def _format_date(value: date) -> str:
     return value.strftime("%Y-%m-%d")
 
 
+def encode_weekdays(weekdays: Iterable[int]) -> str:
+    """Salvo i giorni attivi come bitmask esadecimale (bit 0 = lunedì), es. "0x70"."""
+    mask = 0
+    for dow in weekdays:
+        if 0 <= dow <= 6:
+            mask |= 1 << dow
+    return hex(mask)
+
+
+def decode_weekdays(value: Optional[str]) -> Set[int]:
+    """Decodifico la bitmask "0x.."; le vecchie liste CSV ("4,5,6") restano leggibili."""
+    if not value:
+        return set()
+    value = value.strip()
+    if value[:2].lower() == "0x":
+        try:
+            mask = int(value, 16)
+        except ValueError:
+            return set()
+        return {dow for dow in range(7) if mask >> dow & 1}
+    tokens = value.split(",")
+    try:
+        # Caso normale ("4,5,6"): int() accetta già gli spazi attorno al numero.
+        return {val for val in map(int, tokens) if 0 <= val <= 6}
+    except ValueError:
+        pass
+    weekdays: Set[int] = set()
+    for token in tokens:
+        token = token.strip()
+        if token.isdigit():
+            val = int(token)
+            if 0 <= val <= 6:
+                weekdays.add(val)
+    return weekdays
+
+
+def _locked(method):
+    """Serializzo un mutator di Database sul lock di scrittura della connessione."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+# (name, first_name, last_name, ruolo, grado, is_autista, is_vigile, livello, weekly_cap)
+PersonImportRow = Tuple[
+    str,
+    Optional[str],
+    Optional[str],
+    Optional[str],
+    Optional[str],
+    Optional[bool],
+    Optional[bool],
+    Optional[str],
+    Optional[int],
+]
+
+
 @dataclass
 class Vacation:
     start: date
@@ -93,31 +293,48 @@ class PersonProfile:
         return self.nome or self.cognome or ""
 
 
-def _match_person_identifier(
-    value: Optional[str],
-    roster: Iterable[str],
-    profiles: Dict[str, PersonProfile],
-) -> Optional[str]:
-    """Risolvo un identificativo (nome o cognome) al nome completo presente nelle liste."""
-    if not value:
-        return None
-    target_norm = _normalize_whitespace(value).casefold()
+def _fold(value: str) -> str:
+    # Per testo ASCII lower() coincide con casefold() ma evita le tabelle Unicode.
+    return value.lower() if value.isascii() else value.casefold()
+
+
+def _lookup_key(value: str) -> str:
+    return _fold(_normalize_whitespace(value))
 
-    # match diretto sul nome completo
+
+def _build_lookup(roster: Iterable[str]) -> Dict[str, str]:
+    """Indicizzo i nomi completi per chiave normalizzata (vince il primo in ordine)."""
+    lookup: Dict[str, str] = {}
     for name in roster:
-        if _normalize_whitespace(name).casefold() == target_norm:
-            return name
+        lookup.setdefault(_lookup_key(name), name)
+    return lookup
+
 
-    # match su display name o cognome
+def _build_profile_lookup(profiles: Dict[str, PersonProfile]) -> Dict[str, str]:
+    """Indicizzo display name e cognome di ogni profilo, rispettando l'ordine dei profili."""
+    lookup: Dict[str, str] = {}
     for name, profile in profiles.items():
-        display_norm = _normalize_whitespace(profile.display_name).casefold()
-        if display_norm == target_norm:
-            return name
+        lookup.setdefault(_lookup_key(profile.display_name), name)
         cognome = (profile.cognome or "").strip()
-        if cognome and _normalize_whitespace(cognome).casefold() == target_norm:
-            return name
+        if cognome:
+            lookup.setdefault(_lookup_key(cognome), name)
+    return lookup
 
-    return None
+
+def _resolve_identifier(
+    value: Optional[str],
+    roster_lookup: Dict[str, str],
+    profile_lookup: Dict[str, str],
+) -> Optional[str]:
+    """Risolvo un identificativo (nome o cognome) al nome completo presente nelle liste."""
+    if not value:
+        return None
+    target_norm = _lookup_key(value)
+    # match diretto sul nome completo, poi su display name o cognome
+    name = roster_lookup.get(target_norm)
+    if name is None:
+        name = profile_lookup.get(target_norm)
+    return name
 
 
 @dataclass
@@ -143,13 +360,144 @@ class ProgramConfig:
 class Database:
     """SQLite helper to manage scheduler data."""
 
+    # True solo per le istanze aperte davvero in sola lettura da open_readonly.
+    readonly = False
+
     def __init__(self, path: Path):
         self.path = Path(path)
-        self.conn = sqlite3.connect(str(self.path))
-        self.conn.row_factory = sqlite3.Row
-        self.conn.execute("PRAGMA foreign_keys = ON;")
+        # Autocommit a livello di driver (isolation_level=None): le transazioni multi-statement
+        # le apre esplicitamente transaction(). check_same_thread=False permette di usare l'istanza
+        # da un thread diverso da quello che l'ha aperta, ma una connessione esegue un'operazione
+        # alla volta e condivide transazioni e cursori: un thread che deve leggere mentre un altro
+        # scrive apre una propria Database (con WAL le connessioni distinte non si bloccano).
+        self.conn = sqlite3.connect(
+            str(self.path),
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256,
+        )
+        self._init_state()
+        # WAL + synchronous=NORMAL: niente fsync per ogni commit, letture non bloccate dallo scrittore.
+        self.conn.executescript(
+            """
+            PRAGMA foreign_keys = ON;
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            PRAGMA temp_store = MEMORY;
+            PRAGMA cache_size = -20000;
+            """
+        )
         self._ensure_schema()
 
+    def _init_state(self) -> None:
+        self._write_lock = threading.RLock()
+        self.conn.row_factory = sqlite3.Row
+        # Dentro transaction() i mutator non fanno commit: chiude il blocco con un solo COMMIT.
+        self._autocommit = True
+        # Contatore incrementato da ogni scrittura: invalida la ProgramConfig in cache.
+        self._version = 0
+        self._cached_version: Optional[Tuple[int, int]] = None
+        self._cached_config: Optional[ProgramConfig] = None
+        # Impostazioni e regole lette dalla GUI a ogni refresh: stessa invalidazione per versione.
+        self._settings_cache: Optional[Tuple[Tuple[int, int], Dict[str, str]]] = None
+        self._rules_cache: Optional[Tuple[Tuple[int, int], Dict[str, GenerationRuleConfig]]] = None
+
+    @classmethod
+    def open_readonly(cls, path: Path) -> "Database":
+        """Apro il DB in sola lettura (mode=ro): niente PRAGMA WAL/synchronous né _ensure_schema.
+
+        La connessione non modifica i dati, ma su un DB in WAL SQLite crea comunque (o riusa)
+        i file ``-wal`` e ``-shm``, che possono restare dopo la chiusura: servono a leggere le
+        transazioni confermate e non ancora riportate nel file principale. Per questo non uso
+        ``immutable=1``, che le ignorerebbe.
+
+        Su questo percorso non vengono create tabelle né gli indici di _ensure_schema (se mancano
+        le query funzionano, solo più lente). Le colonne di _COLUMN_MIGRATIONS invece servono:
+        se ne manca qualcuna ripiego sul costruttore normale, che apre in scrittura e migra.
+        L'attributo ``readonly`` dell'istanza restituita dice quale dei due percorsi è stato usato.
+        """
+        path = Path(path)
+        conn = sqlite3.connect(
+            f"{path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256,
+        )
+        conn.execute("PRAGMA query_only = 1")
+        columns = {
+            table: {row[0] for row in conn.execute(_SQL_TABLE_COLUMNS, (table,))}
+            for table in _SCHEMA_TABLES
+        }
+        migrated = all(columns[table] for table in _SCHEMA_TABLES) and all(
+            column in columns[table]
+            for table, migrations in _COLUMN_MIGRATIONS.items()
+            for column, _ in migrations
+        )
+        if not migrated:
+            conn.close()
+            return cls(path)
+        db = cls.__new__(cls)
+        db.path = path
+        db.conn = conn
+        db._init_state()
+        db._columns = columns
+        db.readonly = True
+        return db
+
+    # ------------------------------------------------------------------ #
+    # Transactions
+    # ------------------------------------------------------------------ #
+    @contextmanager
+    def transaction(self, immediate: bool = False) -> Iterator["Database"]:
+        """Raggruppo più operazioni in un'unica transazione (un solo commit/fsync).
+
+        Con ``immediate=True`` il lock di scrittura è preso subito (BEGIN IMMEDIATE), senza
+        passare da SHARED a RESERVED a metà blocco: utile per le importazioni massive.
+        """
+        with self._write_lock:
+            self._version += 1
+            if not self._autocommit:
+                # Già dentro una transazione: il blocco esterno gestisce commit/rollback.
+                yield self
+                return
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            self._autocommit = False
+            try:
+                yield self
+            except BaseException:
+                self.conn.rollback()
+                raise
+            else:
+                self.conn.commit()
+            finally:
+                self._autocommit = True
+                # Dopo un rollback i dati tornano indietro: invalido di nuovo la cache.
+                self._version += 1
+
+    def _cache_version(self) -> Tuple[int, int]:
+        """Versione dei dati per le cache: scritture proprie (_version) e di altre connessioni.
+
+        ``PRAGMA data_version`` cambia quando un'altra connessione fa commit sullo stesso file.
+        """
+        return self._version, self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _rows_tuples(self, sql: str, params: Sequence = ()) -> Iterator[tuple]:
+        """Eseguo una SELECT restituendo tuple semplici, più leggere di sqlite3.Row.
+
+        Il cursore viene consumato in streaming dal chiamante, senza lista intermedia.
+        """
+        cur = self.conn.cursor()
+        cur.row_factory = None
+        return cur.execute(sql, params)
+
+    def _commit(self):
+        """Chiudo una scrittura: invalido la cache e faccio commit se non sono in transaction()."""
+        self._version += 1
+        if self._autocommit:
+            self.conn.commit()
+
     # ------------------------------------------------------------------ #
     # Schema
     # ------------------------------------------------------------------ #
@@ -196,32 +544,46 @@ class Database:
                 note TEXT,
                 FOREIGN KEY(person_id) REFERENCES people(id) ON DELETE CASCADE
             );
+
+            -- Le coppie usano già l'indice implicito del vincolo UNIQUE.
+            CREATE INDEX IF NOT EXISTS idx_vacations_person ON vacations(person_id);
+            CREATE INDEX IF NOT EXISTS idx_settings_value ON settings(value);
             """
         )
         # Migrazioni incrementali: aggiungo colonne se mancanti
-        self._ensure_column("people", "first_name", "TEXT")
-        self._ensure_column("people", "last_name", "TEXT")
-        self._ensure_column("people", "phone", "TEXT")
-        self._ensure_column("people", "email", "TEXT")
-        self._ensure_column("people", "ruolo", "TEXT DEFAULT ''")
-        self._ensure_column("people", "grado", "TEXT")
-        self._ensure_column("people", "weekly_cap", f"INTEGER DEFAULT {DEFAULT_WEEKLY_CAP}")
-        self._ensure_column("people", "rest_hours", "INTEGER NOT NULL DEFAULT 0")
-
-        self._ensure_column("forbidden_pairs", "is_hard", "INTEGER NOT NULL DEFAULT 1")
-        self._ensure_column("preferred_pairs", "is_hard", "INTEGER NOT NULL DEFAULT 0")
+        # Colonne di tutte le tabelle lette una volta sola; _ensure_column usa questa mappa.
+        self._columns: Dict[str, Set[str]] = {
+            table: self._table_columns(table) for table in _SCHEMA_TABLES
+        }
+        alters: List[str] = []
+        for table, columns in _COLUMN_MIGRATIONS.items():
+            existing = self._columns[table]
+            for column, definition in columns:
+                if column not in existing:
+                    alters.append(f"ALTER TABLE {table} ADD COLUMN {column} {definition};")
+                    existing.add(column)
+        if alters:
+            # Un solo script (e un solo commit) per tutte le colonne mancanti.
+            self.conn.executescript("BEGIN;\n" + "\n".join(alters) + "\nCOMMIT;")
 
         self.conn.commit()
 
+    def _table_columns(self, table: str) -> Set[str]:
+        # Funzione pragma_table_info: nome tabella come parametro, statement in cache.
+        return {row[0] for row in self.conn.execute(_SQL_TABLE_COLUMNS, (table,))}
+
     def _ensure_column(self, table: str, column: str, definition: str):
-        cur = self.conn.execute(f"PRAGMA table_info({table})")
-        columns = {row[1] for row in cur.fetchall()}
+        columns = self._columns.get(table)
+        if columns is None:
+            columns = self._columns[table] = self._table_columns(table)
         if column not in columns:
             self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            columns.add(column)
 
     # ------------------------------------------------------------------ #
     # Person management
     # ------------------------------------------------------------------ #
+    @_locked
     def upsert_person(
         self,
         name: str,
@@ -259,88 +621,51 @@ class Database:
         if not base_name:
             raise ValueError("Il nome della persona non può essere vuoto.")
 
-        cur = self.conn.execute(
-            "SELECT id, is_autista, is_vigile, livello FROM people WHERE name = ? COLLATE NOCASE",
-            (base_name,),
+        fields = (
+            first_name,
+            last_name,
+            phone,
+            email,
+            ruolo,
+            grado,
+            int(is_autista) if is_autista is not None else None,
+            int(is_vigile) if is_vigile is not None else None,
+            livello,
+            int(weekly_cap) if weekly_cap is not None else None,
+            int(max(0, rest_hours)) if rest_hours is not None else None,
         )
-        row = cur.fetchone()
-
-        insert_weekly_cap = weekly_cap if weekly_cap is not None else DEFAULT_WEEKLY_CAP
-        insert_rest_hours = max(0, rest_hours) if rest_hours is not None else 0
-
-        if row is None:
-            self.conn.execute(
-                """
-                INSERT INTO people (name, first_name, last_name, phone, email, ruolo, grado,
-                                    is_autista, is_vigile, livello, weekly_cap, rest_hours)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    base_name,
-                    first_name or "",
-                    last_name or "",
-                    phone or "",
-                    email or "",
-                    ruolo or "",
-                    grado or "",
-                    int(is_autista or False),
-                    int(is_vigile or False),
-                    livello or "JUNIOR",
-                    insert_weekly_cap,
-                    insert_rest_hours,
-                ),
-            )
-            self.conn.commit()
-            return int(self.conn.execute("SELECT last_insert_rowid()").fetchone()[0])
-
-        updates: Dict[str, int | str] = {}
-        if first_name is not None:
-            updates["first_name"] = first_name
-        if last_name is not None:
-            updates["last_name"] = last_name
-        if phone is not None:
-            updates["phone"] = phone
-        if email is not None:
-            updates["email"] = email
-        if ruolo is not None:
-            updates["ruolo"] = ruolo
-        if grado is not None:
-            updates["grado"] = grado
-        if is_autista is not None:
-            updates["is_autista"] = int(is_autista)
-        if is_vigile is not None:
-            updates["is_vigile"] = int(is_vigile)
-        if livello is not None:
-            updates["livello"] = livello
-        if weekly_cap is not None:
-            updates["weekly_cap"] = int(weekly_cap)
-        if rest_hours is not None:
-            updates["rest_hours"] = int(max(0, rest_hours))
-
-        if updates:
-            updates["name"] = base_name
-            set_clause = ", ".join(f"{field} = ?" for field in updates.keys())
-            params: List[int | str] = list(updates.values())
-            params.append(row["id"])
-            self.conn.execute(
-                f"UPDATE people SET {set_clause} WHERE id = ?", params
-            )
-            self.conn.commit()
-
-        return int(row["id"])
-
-    def list_people(self) -> List[sqlite3.Row]:
-        cur = self.conn.execute("SELECT * FROM people ORDER BY id")
-        return list(cur.fetchall())
+        # Il nome viene riscritto (es. maiuscole) solo se aggiorno almeno un campo.
+        rename = base_name if any(v is not None for v in fields) else None
+        # Un solo UPSERT: i campi None lasciano invariato il valore esistente. Se la riga
+        # esiste già identica non viene scritta e l'id si legge con una SELECT.
+        params = (base_name, rename, *fields)
+        if _HAS_RETURNING:
+            rows = self.conn.execute(_SQL_UPSERT_PERSON_RETURNING_ID, params).fetchall()
+            changed = bool(rows)
+        else:
+            rows = []
+            changed = self.conn.execute(_SQL_UPSERT_PERSON, params).rowcount > 0
+        if changed:
+            self._commit()
+        if rows:
+            return int(rows[0][0])
+        return int(self.conn.execute(_SQL_GET_PERSON_ID, (base_name,)).fetchone()[0])
+
+    def list_people(self) -> Iterator[sqlite3.Row]:
+        """Restituisco il cursore: le righe vengono lette durante l'iterazione."""
+        return self.conn.execute(_SQL_LIST_PEOPLE)
+
+    def get_person(self, person_id: int) -> Optional[sqlite3.Row]:
+        """Singola riga per chiave primaria: evita di rileggere l'intero elenco."""
+        return self.conn.execute(_SQL_GET_PERSON, (person_id,)).fetchone()
 
     def get_person_id(self, name: str) -> Optional[int]:
         cleaned = _normalize_whitespace(name)
-        cur = self.conn.execute(
-            "SELECT id FROM people WHERE name = ? COLLATE NOCASE", (cleaned,)
-        )
+        cur = self.conn.execute(_SQL_GET_PERSON_ID, (cleaned,))
         row = cur.fetchone()
         return int(row["id"]) if row else None
 
+    @_locked
     def update_person(
         self,
         person_id: int,
@@ -357,7 +682,8 @@ class Database:
         livello: str,
         weekly_cap: int,
         rest_hours: int,
-    ):
+    ) -> sqlite3.Row:
+        """Aggiorno la persona e restituisco la riga salvata (stesse colonne di list_people)."""
         cleaned = _normalize_whitespace(name)
         if not cleaned:
             raise ValueError("Il nome della persona non può essere vuoto.")
@@ -368,88 +694,106 @@ class Database:
         ruolo = _normalize_whitespace(ruolo) if ruolo else ""
         grado = _normalize_whitespace(grado) if grado else ""
 
-        cur = self.conn.execute("SELECT id FROM people WHERE id = ?", (person_id,))
-        if cur.fetchone() is None:
+        # Un solo UPDATE: il duplicato lo segnala il vincolo UNIQUE, l'id mancante nessuna riga restituita.
+        try:
+            cur = self.conn.execute(
+                _SQL_UPDATE_PERSON_RETURNING if _HAS_RETURNING else _SQL_UPDATE_PERSON,
+                (
+                    cleaned,
+                    first_name,
+                    last_name,
+                    phone,
+                    email,
+                    ruolo,
+                    grado,
+                    int(is_autista),
+                    int(is_vigile),
+                    livello or "JUNIOR",
+                    int(weekly_cap),
+                    int(max(0, rest_hours)),
+                    person_id,
+                ),
+            )
+            # fetchall esaurisce lo statement: RETURNING restituisce al più una riga.
+            rows = cur.fetchall()
+            if not _HAS_RETURNING and cur.rowcount > 0:
+                rows = self.conn.execute(_SQL_GET_PERSON, (person_id,)).fetchall()
+        except sqlite3.IntegrityError as exc:
+            raise ValueError("Esiste già una persona con lo stesso nome.") from exc
+        if not rows:
             raise ValueError("Persona non trovata.")
+        self._commit()
+        return rows[0]
 
-        dup = self.conn.execute(
-            "SELECT id FROM people WHERE name = ? COLLATE NOCASE AND id <> ?",
-            (cleaned, person_id),
-        ).fetchone()
-        if dup:
-            raise ValueError("Esiste già una persona con lo stesso nome.")
-
-        self.conn.execute(
-            """
-            UPDATE people
-            SET name = ?, first_name = ?, last_name = ?, phone = ?, email = ?, ruolo = ?, grado = ?,
-                is_autista = ?, is_vigile = ?, livello = ?, weekly_cap = ?
-                , rest_hours = ?
-            WHERE id = ?
-            """,
-            (
-                cleaned,
-                first_name,
-                last_name,
-                phone,
-                email,
-                ruolo,
-                grado,
-                int(is_autista),
-                int(is_vigile),
-                livello or "JUNIOR",
-                int(weekly_cap),
-                int(max(0, rest_hours)),
-                person_id,
-            ),
-        )
-        self.conn.commit()
-
-    def delete_person(self, person_id: int):
+    @_locked
+    def delete_person(self, person_id: int) -> bool:
+        """Elimino la persona; restituisco False se l'id non esiste."""
         cur = self.conn.execute("SELECT name FROM people WHERE id = ?", (person_id,))
         row = cur.fetchone()
         if not row:
-            return
+            return False
         name = row["name"]
-        self.conn.execute("DELETE FROM people WHERE id = ?", (person_id,))
-        # Se una configurazione punta al nome eliminato, la ripuliamo.
-        self.conn.execute("DELETE FROM settings WHERE value = ?", (name,))
-        self.conn.commit()
+        with self.transaction():
+            self.conn.execute("DELETE FROM people WHERE id = ?", (person_id,))
+            # Se una configurazione punta al nome eliminato, la ripuliamo: solo le chiavi
+            # che contengono un nome, cercate per chiave primaria.
+            self.conn.execute(_SQL_CLEAR_PERSON_SETTINGS, (*PERSON_SETTING_KEYS, name))
+        return True
 
     # ------------------------------------------------------------------ #
     # Settings helpers
     # ------------------------------------------------------------------ #
+    @_locked
     def set_setting(self, key: str, value: Optional[str]):
         if value is None:
-            self.conn.execute("DELETE FROM settings WHERE key = ?", (key,))
+            self.conn.execute(_SQL_DELETE_SETTING, (key,))
         else:
-            self.conn.execute(
-                """
-                INSERT INTO settings (key, value)
-                VALUES (?, ?)
-                ON CONFLICT(key) DO UPDATE SET value = excluded.value
-                """,
-                (key, value),
-            )
-        self.conn.commit()
+            self.conn.execute(_SQL_SET_SETTING, (key, value))
+        self._commit()
+
+    def set_settings_bulk(self, items: Iterable[Tuple[str, Optional[str]]]) -> None:
+        """Scrivo più impostazioni insieme; come set_setting, ``None`` elimina la chiave."""
+        upserts: List[Tuple[str, str]] = []
+        deletes: List[Tuple[str]] = []
+        for key, value in items:
+            if value is None:
+                deletes.append((key,))
+            else:
+                upserts.append((key, value))
+        if not upserts and not deletes:
+            return
+        with self.transaction():
+            if deletes:
+                self.conn.executemany(_SQL_DELETE_SETTING, deletes)
+            if upserts:
+                self.conn.executemany(_SQL_SET_SETTING, upserts)
 
     def get_setting(self, key: str, default: Optional[str] = None) -> Optional[str]:
-        cur = self.conn.execute("SELECT value FROM settings WHERE key = ?", (key,))
+        cur = self.conn.execute(_SQL_GET_SETTING, (key,))
         row = cur.fetchone()
         return row["value"] if row else default
 
     def all_settings(self) -> Dict[str, str]:
-        cur = self.conn.execute("SELECT key, value FROM settings")
-        return {row["key"]: row["value"] for row in cur.fetchall()}
+        """Tutte le impostazioni; la query viene rieseguita solo dopo una scrittura (anche di altre connessioni)."""
+        version = self._cache_version()
+        cached = self._settings_cache
+        if cached is not None and cached[0] == version:
+            return dict(cached[1])
+        cur = self.conn.execute(_SQL_ALL_SETTINGS)
+        settings = {row["key"]: row["value"] for row in cur.fetchall()}
+        self._settings_cache = (version, settings)
+        return dict(settings)
 
     def _load_generation_rules(self) -> Dict[str, GenerationRuleConfig]:
         rules = build_default_rules()
+        # Una sola query per tutte le chiavi rule.*, poi lookup in memoria.
+        stored = {row[0]: row[1] for row in self.conn.execute(_SQL_LOAD_RULE_SETTINGS)}
         for key, definition in RULE_DEFINITIONS.items():
-            mode_raw = self.get_setting(f"rule.{key}.mode")
+            mode_raw = stored.get(f"rule.{key}.mode")
             mode = RuleMode.from_value(mode_raw)
             value = rules[key].value
             if definition.has_value:
-                val_raw = self.get_setting(f"rule.{key}.value")
+                val_raw = stored.get(f"rule.{key}.value")
                 if val_raw is not None:
                     try:
                         parsed = int(val_raw)
@@ -467,57 +811,73 @@ class Database:
         return rules
 
     def load_generation_rules_config(self) -> Dict[str, GenerationRuleConfig]:
-        return self._load_generation_rules()
+        version = self._cache_version()
+        cached = self._rules_cache
+        if cached is not None and cached[0] == version:
+            return dict(cached[1])
+        rules = self._load_generation_rules()
+        self._rules_cache = (version, rules)
+        return dict(rules)
 
-    def save_generation_rule(self, key: str, config: GenerationRuleConfig) -> None:
+    @staticmethod
+    def _rule_setting_items(key: str, config: GenerationRuleConfig) -> List[Tuple[str, Optional[str]]]:
+        """Coppie (chiave, valore) di settings che memorizzano una regola di generazione."""
         definition = RULE_DEFINITIONS.get(key)
         if definition is None:
             raise KeyError(f"Regola sconosciuta: {key}")
         if key == "weekly_cap":
             # Forzo sempre hard per evitare che il limite settimanale venga rilassato.
             config = GenerationRuleConfig(mode=RuleMode.HARD, value=None)
-        self.set_setting(f"rule.{key}.mode", config.mode.value)
-        if definition.has_value:
-            if config.value is not None:
-                self.set_setting(f"rule.{key}.value", str(config.value))
-            else:
-                self.set_setting(f"rule.{key}.value", None)
-        else:
-            self.set_setting(f"rule.{key}.value", None)
+        value = str(config.value) if definition.has_value and config.value is not None else None
+        return [(f"rule.{key}.mode", config.mode.value), (f"rule.{key}.value", value)]
+
+    def save_generation_rule(self, key: str, config: GenerationRuleConfig) -> None:
+        self.set_settings_bulk(self._rule_setting_items(key, config))
+
+    def save_generation_rules_bulk(self, configs: Dict[str, GenerationRuleConfig]) -> None:
+        """Salvo più regole con gli stessi executemany di set_settings_bulk."""
+        items: List[Tuple[str, Optional[str]]] = []
+        for key, config in configs.items():
+            items.extend(self._rule_setting_items(key, config))
+        self.set_settings_bulk(items)
 
     def reset_generation_rules_to_defaults(self) -> None:
-        defaults = build_default_rules()
-        for key, cfg in defaults.items():
-            self.save_generation_rule(key, cfg)
+        self.save_generation_rules_bulk(build_default_rules())
 
     # ------------------------------------------------------------------ #
     # Pairs
     # ------------------------------------------------------------------ #
+    @_locked
     def set_forbidden_pair(self, first_id: int, second_id: int, is_hard: bool = True):
         a, b = sorted((first_id, second_id))
         if a == b:
             raise ValueError("Non è possibile creare una coppia vietata con la stessa persona.")
-        self.conn.execute(
-            """
-            INSERT INTO forbidden_pairs (first_id, second_id, is_hard)
-            VALUES (?, ?, ?)
-            ON CONFLICT(first_id, second_id) DO UPDATE SET is_hard = excluded.is_hard
-            """,
-            (a, b, int(is_hard)),
-        )
-        self.conn.commit()
+        self.conn.execute(_SQL_UPSERT_FORBIDDEN_PAIR, (a, b, int(is_hard)))
+        self._commit()
+
+    def set_forbidden_pairs_bulk(self, rows: Iterable[Tuple[int, int, bool]]) -> None:
+        """Inserisco/aggiorno più coppie vietate con un solo statement preparato."""
+        params: List[Tuple[int, int, int]] = []
+        for first_id, second_id, is_hard in rows:
+            a, b = sorted((first_id, second_id))
+            if a == b:
+                raise ValueError("Non è possibile creare una coppia vietata con la stessa persona.")
+            params.append((a, b, int(is_hard)))
+        if not params:
+            return
+        with self.transaction():
+            self.conn.executemany(_SQL_UPSERT_FORBIDDEN_PAIR, params)
 
+    @_locked
     def remove_forbidden_pair(self, first_id: int, second_id: int):
         a, b = sorted((first_id, second_id))
         self.conn.execute(
             "DELETE FROM forbidden_pairs WHERE first_id = ? AND second_id = ?", (a, b)
         )
-        self.conn.commit()
+        self._commit()
 
     def list_forbidden_pairs(self) -> List[Tuple[int, int, bool]]:
-        cur = self.conn.execute(
-            "SELECT first_id, second_id, COALESCE(is_hard, 1) AS is_hard FROM forbidden_pairs ORDER BY first_id, second_id"
-        )
+        cur = self.conn.execute(_SQL_LIST_FORBIDDEN_PAIRS)
         return [
             (int(row["first_id"]), int(row["second_id"]), bool(row["is_hard"]))
             for row in cur.fetchall()
@@ -538,34 +898,40 @@ class Database:
             for row in cur.fetchall()
         ]
 
+    @_locked
     def delete_forbidden_pair(self, pair_id: int):
         self.conn.execute("DELETE FROM forbidden_pairs WHERE id = ?", (pair_id,))
-        self.conn.commit()
+        self._commit()
 
+    @_locked
     def set_preferred_pair(self, autista_id: int, vigile_id: int, is_hard: bool = False):
         if autista_id == vigile_id:
             raise ValueError("Una coppia preferita richiede due persone distinte.")
-        self.conn.execute(
-            """
-            INSERT INTO preferred_pairs (autista_id, vigile_id, is_hard)
-            VALUES (?, ?, ?)
-            ON CONFLICT(autista_id, vigile_id) DO UPDATE SET is_hard = excluded.is_hard
-            """,
-            (autista_id, vigile_id, int(is_hard)),
-        )
-        self.conn.commit()
+        self.conn.execute(_SQL_UPSERT_PREFERRED_PAIR, (autista_id, vigile_id, int(is_hard)))
+        self._commit()
+
+    def set_preferred_pairs_bulk(self, rows: Iterable[Tuple[int, int, bool]]) -> None:
+        """Inserisco/aggiorno più coppie preferite con un solo statement preparato."""
+        params: List[Tuple[int, int, int]] = []
+        for autista_id, vigile_id, is_hard in rows:
+            if autista_id == vigile_id:
+                raise ValueError("Una coppia preferita richiede due persone distinte.")
+            params.append((autista_id, vigile_id, int(is_hard)))
+        if not params:
+            return
+        with self.transaction():
+            self.conn.executemany(_SQL_UPSERT_PREFERRED_PAIR, params)
 
+    @_locked
     def remove_preferred_pair(self, autista_id: int, vigile_id: int):
         self.conn.execute(
             "DELETE FROM preferred_pairs WHERE autista_id = ? AND vigile_id = ?",
             (autista_id, vigile_id),
         )
-        self.conn.commit()
+        self._commit()
 
     def list_preferred_pairs(self) -> List[Tuple[int, int, bool]]:
-        cur = self.conn.execute(
-            "SELECT autista_id, vigile_id, COALESCE(is_hard, 0) AS is_hard FROM preferred_pairs ORDER BY autista_id, vigile_id"
-        )
+        cur = self.conn.execute(_SQL_LIST_PREFERRED_PAIRS)
         return [
             (int(row["autista_id"]), int(row["vigile_id"]), bool(row["is_hard"]))
             for row in cur.fetchall()
@@ -586,33 +952,47 @@ class Database:
             for row in cur.fetchall()
         ]
 
+    @_locked
     def delete_preferred_pair(self, pair_id: int):
         self.conn.execute("DELETE FROM preferred_pairs WHERE id = ?", (pair_id,))
-        self.conn.commit()
+        self._commit()
 
     # ------------------------------------------------------------------ #
     # Vacations
     # ------------------------------------------------------------------ #
+    @_locked
     def add_vacation(
         self, person_id: int, start: date, end: date, note: Optional[str] = None
     ):
         if end < start:
             raise ValueError("La data di fine ferie non può precedere la data di inizio.")
         self.conn.execute(
-            """
-            INSERT INTO vacations (person_id, start_date, end_date, note)
-            VALUES (?, ?, ?, ?)
-            """,
+            _SQL_INSERT_VACATION,
             (person_id, _format_date(start), _format_date(end), note),
         )
-        self.conn.commit()
+        self._commit()
+
+    def add_vacations_bulk(
+        self, rows: Iterable[Tuple[int, date, date, Optional[str]]]
+    ) -> None:
+        params: List[Tuple[int, str, str, Optional[str]]] = []
+        for person_id, start, end, note in rows:
+            if end < start:
+                raise ValueError("La data di fine ferie non può precedere la data di inizio.")
+            params.append((person_id, _format_date(start), _format_date(end), note))
+        if not params:
+            return
+        with self.transaction():
+            self.conn.executemany(_SQL_INSERT_VACATION, params)
 
+    @_locked
     def remove_vacation(self, vacation_id: int):
         self.conn.execute("DELETE FROM vacations WHERE id = ?", (vacation_id,))
-        self.conn.commit()
+        self._commit()
 
-    def list_vacations(self) -> List[sqlite3.Row]:
-        cur = self.conn.execute(
+    def list_vacations(self) -> Iterator[sqlite3.Row]:
+        """Restituisco il cursore: le righe vengono lette durante l'iterazione."""
+        return self.conn.execute(
             """
             SELECT v.id, v.person_id, p.name as person_name, v.start_date, v.end_date, v.note
             FROM vacations v
@@ -620,13 +1000,26 @@ class Database:
             ORDER BY v.start_date, p.name
             """
         )
-        return list(cur.fetchall())
 
     # ------------------------------------------------------------------ #
     # Data loading utilities
     # ------------------------------------------------------------------ #
     def load_program_config(self) -> ProgramConfig:
-        people_rows = self.list_people()
+        """Costruisco la ProgramConfig; la stessa istanza viene riusata finché il DB non cambia.
+
+        L'oggetto restituito è condiviso: i chiamanti non devono modificarlo.
+        """
+        version = self._cache_version()
+        if self._cached_config is not None and self._cached_version == version:
+            return self._cached_config
+        config = self._build_program_config()
+        self._cached_config = config
+        self._cached_version = version
+        return config
+
+    def _build_program_config(self) -> ProgramConfig:
+        # Tuple semplici (niente sqlite3.Row): accesso per posizione secondo _SQL_LOAD_PEOPLE.
+        people_rows = self._rows_tuples(_SQL_LOAD_PEOPLE)
         id_to_name: Dict[int, str] = {}
         autisti: List[str] = []
         vigili: List[str] = []
@@ -635,34 +1028,45 @@ class Database:
         rest_hours: Dict[str, int] = {}
         profiles: Dict[str, PersonProfile] = {}
 
-        for row in people_rows:
-            name = row["name"]
-            id_to_name[int(row["id"])] = name
-            first_name = row["first_name"] or ""
-            last_name = row["last_name"] or ""
+        intern = sys.intern
+        for (
+            person_id,
+            name,
+            first_name,
+            last_name,
+            phone,
+            email,
+            ruolo,
+            grado,
+            is_autista,
+            is_vigile,
+            livello,
+            weekly_cap_raw,
+            rest_raw,
+        ) in people_rows:
+            id_to_name[person_id] = name
+            first_name = first_name or ""
+            last_name = last_name or ""
             # fallback smart: se non presente ma name contiene spazi, provo a splittare
             if not first_name and name:
                 parts = name.split(" ", 1)
                 first_name = parts[0]
                 if len(parts) > 1 and not last_name:
                     last_name = parts[1]
-            weekly_cap = (
-                int(row["weekly_cap"])
-                if row["weekly_cap"] is not None
-                else DEFAULT_WEEKLY_CAP
-            )
-            rest_value = int(row["rest_hours"]) if row["rest_hours"] is not None else 0
+            weekly_cap = int(weekly_cap_raw) if weekly_cap_raw is not None else DEFAULT_WEEKLY_CAP
+            rest_value = int(rest_raw) if rest_raw is not None else 0
+            # Valori categorici ripetuti su tutte le righe: li internalizzo per condividerli.
             profile = PersonProfile(
-                id=int(row["id"]),
+                id=int(person_id),
                 nome=first_name or name,
                 cognome=last_name or "",
-                telefono=row["phone"] or "",
-                email=row["email"] or "",
-                ruolo=row["ruolo"] or "",
-                grado=row["grado"] or "",
-                is_autista=bool(row["is_autista"]),
-                is_vigile=bool(row["is_vigile"]),
-                livello=row["livello"] or "JUNIOR",
+                telefono=phone or "",
+                email=email or "",
+                ruolo=intern(ruolo or ""),
+                grado=intern(grado or ""),
+                is_autista=bool(is_autista),
+                is_vigile=bool(is_vigile),
+                livello=intern(livello or "JUNIOR"),
                 weekly_cap=weekly_cap,
                 rest_hours=rest_value,
             )
@@ -676,50 +1080,45 @@ class Database:
                 esperienza[name] = profile.livello
 
         forbidden_pairs: List[ConstraintRule] = []
-        for first_id, second_id, is_hard in self.list_forbidden_pairs():
+        for first_id, second_id, is_hard in self._rows_tuples(_SQL_LIST_FORBIDDEN_PAIRS):
             name1 = id_to_name.get(first_id)
             name2 = id_to_name.get(second_id)
             if name1 and name2:
                 forbidden_pairs.append(
-                    ConstraintRule(primo=name1, secondo=name2, is_hard=is_hard)
+                    ConstraintRule(primo=name1, secondo=name2, is_hard=bool(is_hard))
                 )
 
         preferred_pairs: List[PreferredRule] = []
-        for autista_id, vigile_id, is_hard in self.list_preferred_pairs():
+        for autista_id, vigile_id, is_hard in self._rows_tuples(_SQL_LIST_PREFERRED_PAIRS):
             aut_name = id_to_name.get(autista_id)
             vig_name = id_to_name.get(vigile_id)
             if aut_name and vig_name:
                 preferred_pairs.append(
-                    PreferredRule(autista=aut_name, vigile=vig_name, is_hard=is_hard)
+                    PreferredRule(autista=aut_name, vigile=vig_name, is_hard=bool(is_hard))
                 )
 
+        # Niente JOIN su people: il nome lo risolvo con id_to_name già costruito.
         ferie: Dict[str, List[Vacation]] = {}
-        for row in self.list_vacations():
+        for person_id, start_date, end_date, note in self._rows_tuples(_SQL_LOAD_VACATIONS):
+            person_name = id_to_name.get(int(person_id))
+            if person_name is None:
+                continue
             vac = Vacation(
-                start=_parse_date(row["start_date"]),
-                end=_parse_date(row["end_date"]),
-                note=row["note"],
+                start=_parse_date(start_date),
+                end=_parse_date(end_date),
+                note=note,
             )
-            ferie.setdefault(row["person_name"], []).append(vac)
+            ferie.setdefault(person_name, []).append(vac)
 
-        key_autista_varchi = self.get_setting("autista_varchi")
-        key_autista_pogliani = self.get_setting("autista_pogliani")
-        key_vigile_estate = self.get_setting("vigile_escluso_estate")
+        settings = self.all_settings()
+        key_autista_varchi = settings.get("autista_varchi")
+        key_autista_pogliani = settings.get("autista_pogliani")
+        key_vigile_estate = settings.get("vigile_escluso_estate")
         min_esperti_value = int(
-            self.get_setting("min_esperti", str(DEFAULT_MIN_ESPERTI))
-        )
-        weekdays_setting = self.get_setting(
-            "active_weekdays",
-            ",".join(str(x) for x in sorted(DEFAULT_ACTIVE_WEEKDAYS)),
+            settings.get("min_esperti", str(DEFAULT_MIN_ESPERTI))
         )
-        enable_varchi_rule_str = self.get_setting("enable_varchi_rule", "1")
-        active_weekdays: Set[int] = set()
-        for token in (weekdays_setting or "").split(","):
-            token = token.strip()
-            if token.isdigit():
-                val = int(token)
-                if 0 <= val <= 6:
-                    active_weekdays.add(val)
+        enable_varchi_rule_str = settings.get("enable_varchi_rule", "1")
+        active_weekdays = decode_weekdays(settings.get("active_weekdays"))
         if not active_weekdays:
             active_weekdays = set(DEFAULT_ACTIVE_WEEKDAYS)
         varchi_rule_enabled = enable_varchi_rule_str != "0"
@@ -733,16 +1132,21 @@ class Database:
         if rules.get("varchi_rotation") and rules["varchi_rotation"].mode == RuleMode.OFF:
             varchi_rule_enabled = False
 
-        autista_varchi_name = _match_person_identifier(key_autista_varchi, autisti, profiles)
-        autista_pogliani_name = _match_person_identifier(key_autista_pogliani, autisti, profiles)
-        vigile_estivo_name = _match_person_identifier(key_vigile_estate, vigili, profiles)
+        # Indici normalizzati costruiti una volta sola: ogni risoluzione è un dict.get.
+        autisti_lookup = _build_lookup(autisti)
+        vigili_lookup = _build_lookup(vigili)
+        profile_lookup = _build_profile_lookup(profiles)
+
+        autista_varchi_name = _resolve_identifier(key_autista_varchi, autisti_lookup, profile_lookup)
+        autista_pogliani_name = _resolve_identifier(key_autista_pogliani, autisti_lookup, profile_lookup)
+        vigile_estivo_name = _resolve_identifier(key_vigile_estate, vigili_lookup, profile_lookup)
 
         if varchi_rule_enabled and not autista_varchi_name:
-            autista_varchi_name = _match_person_identifier(DEFAULT_AUTISTA_VARCHI, autisti, profiles)
+            autista_varchi_name = _resolve_identifier(DEFAULT_AUTISTA_VARCHI, autisti_lookup, profile_lookup)
         if varchi_rule_enabled and not autista_pogliani_name:
-            autista_pogliani_name = _match_person_identifier(DEFAULT_AUTISTA_POGLIANI, autisti, profiles)
+            autista_pogliani_name = _resolve_identifier(DEFAULT_AUTISTA_POGLIANI, autisti_lookup, profile_lookup)
         if not vigile_estivo_name:
-            vigile_estivo_name = _match_person_identifier(DEFAULT_VIGILE_ESCLUSO_ESTATE, vigili, profiles)
+            vigile_estivo_name = _resolve_identifier(DEFAULT_VIGILE_ESCLUSO_ESTATE, vigili_lookup, profile_lookup)
         if rules.get("summer_exclusion") and rules["summer_exclusion"].mode == RuleMode.OFF:
             vigile_estivo_name = None
 
@@ -783,97 +1187,165 @@ class Database:
         def _load_lines(path: Path) -> List[str]:
             if not path.exists():
                 return []
-            names: List[str] = []
-            with path.open("r", encoding="utf-8") as handle:
-                for raw in handle:
-                    val = _normalize_whitespace(raw)
-                    if not val or val.startswith("#"):
-                        continue
-                    if val not in names:
-                        names.append(val)
-            return names
+            # Lettura unica + splitlines; dict.fromkeys deduplica mantenendo l'ordine.
+            values = map(_normalize_whitespace, path.read_bytes().decode("utf-8").splitlines())
+            return list(dict.fromkeys(val for val in values if val and not val.startswith("#")))
 
         autisti = _load_lines(autisti_path)
         vigili_junior = _load_lines(vigili_path)
         vigili_senior = _load_lines(vigili_senior_path) if vigili_senior_path else []
 
-        def _split(full_name: str) -> Tuple[str, str]:
-            chunks = full_name.split()
-            if len(chunks) >= 2:
-                return chunks[0], " ".join(chunks[1:])
-            return full_name, ""
-
-        ruolo_map: Dict[str, str] = {}
-
-        with self.conn:
-            for name in autisti:
-                first, last = _split(name)
-                ruolo_map[name] = ROLE_AUTISTA
-                self.upsert_person(
-                    name,
-                    first_name=first,
-                    last_name=last,
-                    ruolo=ROLE_AUTISTA,
-                    is_autista=True,
-                    is_vigile=False,
-                    weekly_cap=DEFAULT_WEEKLY_CAP,
-                )
-            for name in vigili_junior:
-                first, last = _split(name)
-                ruolo = ruolo_map.get(name, ROLE_VIGILE)
-                if ruolo == ROLE_AUTISTA:
-                    ruolo = ROLE_AUTISTA_VIGILE
-                ruolo_map[name] = ruolo
-                self.upsert_person(
-                    name,
-                    first_name=first,
-                    last_name=last,
-                    ruolo=ruolo,
-                    grado="JUNIOR",
-                    is_vigile=True,
-                    livello="JUNIOR",
-                    weekly_cap=DEFAULT_WEEKLY_CAP,
-                )
-            for name in vigili_senior:
-                first, last = _split(name)
-                ruolo = ruolo_map.get(name, ROLE_VIGILE)
-                if ruolo == ROLE_AUTISTA:
-                    ruolo = ROLE_AUTISTA_VIGILE
-                ruolo_map[name] = ruolo
-                self.upsert_person(
+        # Un solo passaggio: per ogni nome distinto calcolo lo stato finale (ruolo, grado,
+        # flag) e lo scrivo con un'unica riga, invece di una riga per elenco di appartenenza.
+        autisti_set = frozenset(autisti)
+        junior_set = frozenset(vigili_junior)
+        senior_set = frozenset(vigili_senior)
+        rows: List[PersonImportRow] = []
+        for name in dict.fromkeys([*autisti, *vigili_junior, *vigili_senior]):
+            first, last = _split_full_name(name)
+            is_autista = name in autisti_set
+            if name in senior_set:
+                livello: Optional[str] = "SENIOR"
+            elif name in junior_set:
+                livello = "JUNIOR"
+            else:
+                livello = None
+            is_vigile = livello is not None
+            if is_autista and is_vigile:
+                ruolo = ROLE_AUTISTA_VIGILE
+            elif is_autista:
+                ruolo = ROLE_AUTISTA
+            else:
+                ruolo = ROLE_VIGILE
+            rows.append(
+                (
                     name,
-                    first_name=first,
-                    last_name=last,
-                    ruolo=ruolo,
-                    grado="SENIOR",
-                    is_vigile=True,
-                    livello="SENIOR",
-                    weekly_cap=DEFAULT_WEEKLY_CAP,
+                    first,
+                    last,
+                    ruolo,
+                    livello,
+                    True if is_autista else None,
+                    is_vigile,
+                    livello,
+                    DEFAULT_WEEKLY_CAP,
                 )
+            )
 
-        if set_defaults:
-            # Try to populate settings based on common names
-            if DEFAULT_AUTISTA_VARCHI in autisti:
-                self.set_setting("autista_varchi", DEFAULT_AUTISTA_VARCHI)
-            if DEFAULT_AUTISTA_POGLIANI in autisti:
-                self.set_setting("autista_pogliani", DEFAULT_AUTISTA_POGLIANI)
-            if DEFAULT_VIGILE_ESCLUSO_ESTATE in vigili_junior:
-                self.set_setting(
-                    "vigile_escluso_estate", DEFAULT_VIGILE_ESCLUSO_ESTATE
-                )
-            self.set_setting("enable_varchi_rule", "1")
-
-            # Populate default constraints
-            for a_name, b_name in DEFAULT_FORBIDDEN_PAIRS:
-                a_id = self.get_person_id(a_name)
-                b_id = self.get_person_id(b_name)
-                if a_id and b_id:
-                    self.set_forbidden_pair(a_id, b_id)
-            for aut_name, vig_name in DEFAULT_PREFERRED_PAIRS:
-                aut_id = self.get_person_id(aut_name)
-                vig_id = self.get_person_id(vig_name)
-                if aut_id and vig_id:
-                    self.set_preferred_pair(aut_id, vig_id, is_hard=False)
+        # Persone, impostazioni e vincoli di default in un'unica transazione di scrittura:
+        # anche la lettura dello stato attuale avviene sotto lo stesso lock.
+        with self.transaction(immediate=True):
+            self.bulk_upsert_persons(self._changed_person_rows(rows))
+            if set_defaults:
+                self._apply_import_defaults(autisti_set, junior_set)
+
+    def _changed_person_rows(self, rows: Iterable[PersonImportRow]) -> List[PersonImportRow]:
+        """Filtro le righe che non modificherebbero la persona già presente nel DB.
+
+        Confronto in Python lo stato attuale con quello risultante dall'upsert (i campi
+        ``None`` restano invariati): le righe identiche non vengono riscritte, evitando
+        scritture e aggiornamenti d'indice inutili a ogni reimport.
+        """
+        current: Dict[str, tuple] = {
+            row[0].translate(_NOCASE_FOLD): row for row in self._rows_tuples(_SQL_LOAD_IMPORT_STATE)
+        }
+        changed: List[PersonImportRow] = []
+        for row in rows:
+            key = row[0].translate(_NOCASE_FOLD)
+            before = current.get(key)
+            is_new = before is None
+            if is_new:
+                # Valori di default dell'INSERT: servono solo per i confronti con righe successive.
+                before = (row[0], "", "", "", "", 0, 0, "JUNIOR", DEFAULT_WEEKLY_CAP)
+            after = tuple(
+                before[idx] if value is None else (int(value) if isinstance(value, bool) else value)
+                for idx, value in enumerate(row)
+            )
+            if is_new or after != before:
+                changed.append(row)
+                current[key] = after
+        return changed
+
+    def bulk_upsert_persons(self, rows: Iterable[PersonImportRow]) -> None:
+        """Inserisco/aggiorno più persone con un solo statement preparato.
+
+        Ogni riga è ``(name, first_name, last_name, ruolo, grado, is_autista, is_vigile,
+        livello, weekly_cap)``; i campi ``None`` lasciano invariato il valore esistente
+        (o usano il default in inserimento). Le righe sono applicate in ordine, quindi
+        un nome ripetuto riceve gli aggiornamenti in sequenza come con upsert_person.
+        """
+        params = [
+            (
+                name,
+                name,
+                first_name,
+                last_name,
+                None,
+                None,
+                ruolo,
+                grado,
+                int(is_autista) if is_autista is not None else None,
+                int(is_vigile) if is_vigile is not None else None,
+                livello,
+                weekly_cap,
+                None,
+            )
+            for name, first_name, last_name, ruolo, grado, is_autista, is_vigile, livello, weekly_cap in rows
+        ]
+        if not params:
+            return
+        with self.transaction():
+            self.conn.executemany(_SQL_UPSERT_PERSON, params)
+
+    def _apply_import_defaults(
+        self, autisti: FrozenSet[str], vigili_junior: FrozenSet[str]
+    ) -> None:
+        # Try to populate settings based on common names
+        settings: List[Tuple[str, Optional[str]]] = []
+        if DEFAULT_AUTISTA_VARCHI in autisti:
+            settings.append(("autista_varchi", DEFAULT_AUTISTA_VARCHI))
+        if DEFAULT_AUTISTA_POGLIANI in autisti:
+            settings.append(("autista_pogliani", DEFAULT_AUTISTA_POGLIANI))
+        if DEFAULT_VIGILE_ESCLUSO_ESTATE in vigili_junior:
+            settings.append(("vigile_escluso_estate", DEFAULT_VIGILE_ESCLUSO_ESTATE))
+        settings.append(("enable_varchi_rule", "1"))
+        self.set_settings_bulk(settings)
+
+        # Populate default constraints: tutti gli id risolti con una sola SELECT.
+        id_by_name = self._person_ids_by_name(
+            {name for pair in (*DEFAULT_FORBIDDEN_PAIRS, *DEFAULT_PREFERRED_PAIRS) for name in pair}
+        )
+        forbidden_rows: List[Tuple[int, int, bool]] = []
+        for a_name, b_name in DEFAULT_FORBIDDEN_PAIRS:
+            a_id = id_by_name.get(a_name)
+            b_id = id_by_name.get(b_name)
+            if a_id and b_id:
+                forbidden_rows.append((a_id, b_id, True))
+        self.set_forbidden_pairs_bulk(forbidden_rows)
+        preferred_rows: List[Tuple[int, int, bool]] = []
+        for aut_name, vig_name in DEFAULT_PREFERRED_PAIRS:
+            aut_id = id_by_name.get(aut_name)
+            vig_id = id_by_name.get(vig_name)
+            if aut_id and vig_id:
+                preferred_rows.append((aut_id, vig_id, False))
+        self.set_preferred_pairs_bulk(preferred_rows)
+
+    def _person_ids_by_name(self, names: Iterable[str]) -> Dict[str, int]:
+        """Risolvo più nomi in un colpo solo (stesso confronto NOCASE di get_person_id)."""
+        cleaned = {name: _normalize_whitespace(name) for name in names}
+        if not cleaned:
+            return {}
+        placeholders = ", ".join("?" for _ in cleaned)
+        cur = self._rows_tuples(
+            f"SELECT id, name FROM people WHERE name IN ({placeholders})",
+            tuple(cleaned.values()),
+        )
+        # NOCASE confronta solo le lettere ASCII: uso lower() per ricollegare i nomi richiesti.
+        found = {name.lower(): int(person_id) for person_id, name in cur}
+        return {
+            name: found[value.lower()]
+            for name, value in cleaned.items()
+            if value.lower() in found
+        }
 
     def close(self):
         self.conn.close()
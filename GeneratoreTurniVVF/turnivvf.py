@@ -10,11 +10,7 @@ import random
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Sequence
-
-from database import Database
-from vvf_scheduler.config import build_program_config_from_files
-from vvf_scheduler.runner import esegui
+from typing import List, Optional, Sequence, Set
 
 
 def _setup_logging(verbose: bool = False) -> None:
@@ -30,10 +26,12 @@ def _parse_months(values: Optional[Sequence[int]], parser: argparse.ArgumentPars
     if not values:
         return None
     mesi: List[int] = []
+    visti: Set[int] = set()
     for raw in values:
         if raw < 1 or raw > 12:
             parser.error("I mesi devono essere compresi tra 1 e 12.")
-        if raw not in mesi:
+        if raw not in visti:
+            visti.add(raw)
             mesi.append(raw)
     return mesi
 
@@ -43,13 +41,13 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
         description="VVF Weekend Scheduler – turni weekend → Excel + ICS + Log (IT)"
     )
     parser.add_argument("--year", type=int, default=datetime.now().year, help="Anno di riferimento (default: anno corrente)")
-    parser.add_argument("--db", type=Path, default=Path("vvf_data.db"), help="Percorso del database SQLite (default: vvf_data.db)")
+    parser.add_argument("--db", default="vvf_data.db", help="Percorso del database SQLite (default: vvf_data.db)")
     parser.add_argument("--import-from-text", action="store_true", help="Importa i file legacy nel database prima di generare i turni")
     parser.add_argument("--skip-db", action="store_true", help="Usa esclusivamente i file legacy senza database")
-    parser.add_argument("--autisti", type=Path, default=Path("autisti.txt"), help="File autisti.txt (per import/legacy)")
-    parser.add_argument("--vigili", type=Path, default=Path("vigili.txt"), help="File vigili.txt (JUNIOR, per import/legacy)")
-    parser.add_argument("--vigili-senior", type=Path, default=Path("vigili_senior.txt"), help="File vigili_senior.txt (SENIOR, per import/legacy)")
-    parser.add_argument("--out", type=Path, default=Path("output"), help="Cartella di output")
+    parser.add_argument("--autisti", default="autisti.txt", help="File autisti.txt (per import/legacy)")
+    parser.add_argument("--vigili", default="vigili.txt", help="File vigili.txt (JUNIOR, per import/legacy)")
+    parser.add_argument("--vigili-senior", default="vigili_senior.txt", help="File vigili_senior.txt (SENIOR, per import/legacy)")
+    parser.add_argument("--out", default="output", help="Cartella di output")
     parser.add_argument("--seed", type=int, default=None, help="Seed RNG per risultati ripetibili")
     parser.add_argument(
         "--months",
@@ -60,22 +58,34 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     parser.add_argument("--verbose", action="store_true", help="Abilita log dettagliati su stdout")
     args = parser.parse_args(argv)
 
+    # Import differiti: --help e gli errori di argomenti non caricano openpyxl & co.
+    from database import Database
+    from vvf_scheduler.config import build_program_config_from_files
+    from vvf_scheduler.runner import esegui
+
     _setup_logging(verbose=args.verbose)
     logging.debug("Argomenti CLI: %s", args)
 
     months = _parse_months(args.months, parser)
-    if args.seed is not None:
-        random.seed(args.seed)
+    # Generatore locale passato allo scheduler: con --seed i risultati sono ripetibili.
+    rng = random.Random(args.seed)
 
+    # I percorsi arrivano come stringhe: Path solo dove servono davvero.
     if args.skip_db:
-        config = build_program_config_from_files(args.autisti, args.vigili, args.vigili_senior)
+        config = build_program_config_from_files(Path(args.autisti), Path(args.vigili), Path(args.vigili_senior))
     else:
-        with Database(args.db) as db:
+        db_path = Path(args.db)
+        # Solo generazione su DB esistente: connessione in sola lettura, senza PRAGMA né schema.
+        # Uno schema da migrare fa ripiegare open_readonly sull'apertura in scrittura.
+        readonly = not args.import_from_text and db_path.exists()
+        with (Database.open_readonly(db_path) if readonly else Database(db_path)) as db:
+            if readonly and not db.readonly:
+                logging.info("Schema del database da aggiornare: aperto in scrittura per la migrazione.")
             if args.import_from_text:
                 db.import_from_text_files(
-                    autisti_path=args.autisti,
-                    vigili_path=args.vigili,
-                    vigili_senior_path=args.vigili_senior,
+                    autisti_path=Path(args.autisti),
+                    vigili_path=Path(args.vigili),
+                    vigili_senior_path=Path(args.vigili_senior),
                     set_defaults=True,
                 )
             config = db.load_program_config()
@@ -84,7 +94,7 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
                 "Il database non contiene autisti/vigili sufficienti. Popola i dati dalla GUI oppure usa --import-from-text."
             )
 
-    xlsx_path, ics_path, log_path, _ = esegui(args.year, config, args.out, months, args.seed)
+    xlsx_path, ics_path, log_path, _ = esegui(args.year, config, Path(args.out), months, args.seed, rng)
     print("Operazione completata. File generati:")
     print(f"- {xlsx_path}")
     print(f"- {ics_path}")
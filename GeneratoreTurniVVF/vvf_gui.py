@@ -3,14 +3,19 @@ from __future__ import annotations
 import argparse
 import tkinter as tk
 import queue
+import sqlite3
 import subprocess
 import sys
 import threading
+import time
 import locale
-from datetime import datetime
+from contextlib import contextmanager
+from operator import itemgetter
+from dataclasses import dataclass, fields
+from datetime import date, datetime
 from pathlib import Path
 from tkinter import filedialog, messagebox, ttk
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
 
 from vvf_scheduler.rules import (
     RULE_DEFINITIONS,
@@ -29,9 +34,16 @@ from database import (
     ROLE_AUTISTA,
     ROLE_AUTISTA_VIGILE,
     ROLE_VIGILE,
+    decode_weekdays,
+    encode_weekdays,
 )
 
 ROLE_OPTIONS = [ROLE_AUTISTA, ROLE_VIGILE, ROLE_AUTISTA_VIGILE]
+_AUTISTA_ROLES = frozenset({ROLE_AUTISTA, ROLE_AUTISTA_VIGILE})
+_VIGILE_ROLES = frozenset({ROLE_VIGILE, ROLE_AUTISTA_VIGILE})
+# Etichette delle celle indicizzate con bool(...): evitano il ramo condizionale per riga.
+_BOOL_SI_NO = ("No", "Sì")
+_HARD_DURO = ("Morbido", "Duro")
 GRADE_OPTIONS = ["JUNIOR", "SENIOR", "ALTRO"]
 WEEKDAY_LABELS = {
     0: "Lunedì",
@@ -64,6 +76,63 @@ MODE_DISPLAY = {
 MODE_FROM_DISPLAY = {label: key for key, label in MODE_DISPLAY.items()}
 
 LIV_JUNIOR = "JUNIOR"
+# Messaggi del processo di generazione letti per ogni giro di polling.
+_GENERATE_DRAIN_CHUNK = 64
+# Righe dell'output di generazione accodate insieme dal thread di lettura.
+_GENERATE_BATCH_LINES = 32
+_GENERATE_BATCH_SECONDS = 0.05
+# Colonne del Treeview persone, nello stesso ordine di _person_tree_values.
+PEOPLE_COLUMNS = (
+    "nome",
+    "ruolo",
+    "grado",
+    "autista",
+    "vigile",
+    "weekly_cap",
+    "rest_hours",
+    "telefono",
+    "email",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Person:
+    """Riga della tabella people usata dalla GUI (accesso per attributo, niente dict per riga)."""
+
+    id: int
+    name: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    phone: Optional[str]
+    email: Optional[str]
+    ruolo: Optional[str]
+    grado: Optional[str]
+    is_autista: int
+    is_vigile: int
+    weekly_cap: Optional[int]
+    rest_hours: Optional[int]
+
+    @classmethod
+    def from_row(cls, row) -> "Person":
+        return cls(*_PERSON_GETTER(row))
+
+
+_PERSON_FIELDS = tuple(f.name for f in fields(Person))
+# Estrae in C i campi di Person da una sqlite3.Row, nell'ordine del costruttore.
+_PERSON_GETTER = itemgetter(*_PERSON_FIELDS)
+
+def _parse_iso_date(text: str) -> date:
+    """Data nel formato YYYY-MM-DD: date.fromisoformat (in C) per la forma con zeri, strptime per il resto."""
+    text = text.strip()
+    # Da Python 3.11 fromisoformat accetta anche altre forme ISO (es. 20240105): lo uso solo su YYYY-MM-DD.
+    if len(text) == 10 and text[4] == "-" and text[7] == "-":
+        return date.fromisoformat(text)
+    # Date senza zeri iniziali (es. 2024-1-5), accettate da sempre dal form ferie.
+    return datetime.strptime(text, "%Y-%m-%d").date()
+
+
+# (nomi ordinati, id nello stesso ordine)
+SortedPeople = Tuple[Tuple[str, ...], Tuple[int, ...]]
 
 
 class SchedulerManagerApp(tk.Tk):
@@ -75,44 +144,124 @@ class SchedulerManagerApp(tk.Tk):
         self.geometry("1120x680")
 
         self.db_path = Path(db_path)
-        self.db = Database(self.db_path)
-        self.db.reset_generation_rules_to_defaults()
-        self.people_cache: Dict[int, Dict[str, object]] = {}
-        self.name_to_id: Dict[str, int] = {}
+        # Il DB viene aperto da un thread di supporto (vedi _bg_init_db): la finestra appare subito.
+        self.db: Optional[Database] = None
+        self._db_queue: "queue.Queue[object]" = queue.Queue()
+        self._db_poll_id: Optional[str] = None
+        self.people_cache: Dict[int, Person] = {}
         self.autisti_names: Set[str] = set()
         self.vigili_names: Set[str] = set()
         self.selected_person_id: Optional[int] = None
         self.generate_running = False
         self.generate_queue: "queue.Queue[str]" = queue.Queue()
+        # Refresh richiesti dalle azioni, eseguiti una sola volta al prossimo idle.
+        self._refresh_pending: Set[str] = set()
+        self._refresh_after_id: Optional[str] = None
+        # Cambi di ruolo ravvicinati (frecce sulla combobox) applicano solo l'ultimo stato.
+        self._grade_toggle_after: Optional[str] = None
+        # Elenchi ordinati (nomi + id allineati per indice) per le combobox, riusati
+        # finché le persone elencate non cambiano; l'id si ricava da combo.current().
+        self._sorted_cache: Dict[str, Tuple[FrozenSet[Tuple[str, int]], SortedPeople]] = {}
+        self._pairs_vigili: SortedPeople = ((), ())
+        self._pairs_autisti: SortedPeople = ((), ())
+        self._vacation_people: SortedPeople = ((), ())
+        self._settings_autisti: SortedPeople = ((), ())
+        self._settings_vigili: SortedPeople = ((), ())
+        # Letture dei refresh e salvataggio impostazioni eseguiti da un thread dedicato (vedi _async_query):
+        # i risultati tornano al thread Tk tramite _query_queue.
+        self._query_requests: "queue.Queue[Optional[Tuple[Callable[[Database], object], Callable[[object], None], Optional[Callable[[Exception], None]]]]]" = queue.Queue()
+        self._query_queue: "queue.Queue[Tuple[Callable[[object], None], Optional[Callable[[Exception], None]], object, Optional[Exception]]]" = queue.Queue()
+        self._query_worker: Optional[threading.Thread] = None
+        self._query_pending = 0
+        self._query_poll_id: Optional[str] = None
+        # Salvataggio impostazioni in corso sul worker: niente secondo salvataggio né refresh del form.
+        self._settings_saving = False
+        self._settings_refresh_deferred = False
 
         self._build_ui()
-        self.refresh_all()
         self.protocol("WM_DELETE_WINDOW", self.on_close)
+        threading.Thread(target=self._bg_init_db, daemon=True).start()
+        self._db_poll_id = self.after(50, self._poll_db_ready)
+
+    def _bg_init_db(self) -> None:
+        # La connessione è condivisa col thread Tk (check_same_thread=False in Database).
+        try:
+            db = Database(self.db_path)
+            db.reset_generation_rules_to_defaults()
+        except Exception as exc:
+            self._db_queue.put(exc)
+        else:
+            self._db_queue.put(db)
+
+    def _poll_db_ready(self) -> None:
+        try:
+            result = self._db_queue.get_nowait()
+        except queue.Empty:
+            self._db_poll_id = self.after(50, self._poll_db_ready)
+            return
+        self._db_poll_id = None
+        if isinstance(result, Exception):
+            messagebox.showerror("Errore", f"Impossibile aprire il database: {result}")
+            self.destroy()
+            return
+        self.db = result
+        self.loading_label.destroy()
+        self.notebook.pack(fill="both", expand=True, padx=10, pady=10)
+        self.refresh_all()
 
     # ---------------------- UI Skeleton ---------------------- #
     def _build_ui(self) -> None:
-        notebook = ttk.Notebook(self)
-        notebook.pack(fill="both", expand=True, padx=10, pady=10)
+        # Il notebook viene mostrato quando il database è pronto (_poll_db_ready).
+        self.loading_label = ttk.Label(self, text="Caricamento…", anchor="center")
+        self.loading_label.pack(fill="both", expand=True, padx=10, pady=10)
+        self.notebook = ttk.Notebook(self)
+        notebook = self.notebook
 
         self.people_frame = ttk.Frame(notebook)
         notebook.add(self.people_frame, text="Personale")
         self._build_people_tab(self.people_frame)
 
-        self.pairs_frame = ttk.Frame(notebook)
-        notebook.add(self.pairs_frame, text="Coppie & Vincoli")
-        self._build_pairs_tab(self.pairs_frame)
-
-        self.vacations_frame = ttk.Frame(notebook)
-        notebook.add(self.vacations_frame, text="Ferie")
-        self._build_vacations_tab(self.vacations_frame)
-
-        self.settings_frame = ttk.Frame(notebook)
-        notebook.add(self.settings_frame, text="Impostazioni")
-        self._build_settings_tab(self.settings_frame)
+        # Le altre schede vengono costruite alla prima apertura (_on_tab_changed).
+        self._lazy_tabs: Dict[str, Tuple[ttk.Frame, Callable[[ttk.Frame], None], Optional[Callable[[], None]]]] = {}
+        self.pairs_frame = self._add_lazy_tab(notebook, "Coppie & Vincoli", self._build_pairs_tab, self.refresh_pairs_lists)
+        self.vacations_frame = self._add_lazy_tab(notebook, "Ferie", self._build_vacations_tab, self.refresh_vacations)
+        self.settings_frame = self._add_lazy_tab(
+            notebook, "Impostazioni", self._build_settings_tab, self.refresh_settings_inputs
+        )
+        self.generation_frame = self._add_lazy_tab(notebook, "Genera turni", self._build_generation_tab, None)
+        notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+        # Ordine fisso dei refresh: l'elenco persone aggiorna i nomi usati dalle altre schede.
+        self._tab_refreshers: Tuple[Tuple[str, ttk.Frame, Callable[[], None]], ...] = (
+            ("people", self.people_frame, self.refresh_people_list),
+            ("pairs", self.pairs_frame, self.refresh_pairs_lists),
+            ("vacations", self.vacations_frame, self.refresh_vacations),
+            ("settings", self.settings_frame, self.refresh_settings_inputs),
+        )
 
-        self.generation_frame = ttk.Frame(notebook)
-        notebook.add(self.generation_frame, text="Genera turni")
-        self._build_generation_tab(self.generation_frame)
+    def _add_lazy_tab(
+        self,
+        notebook: ttk.Notebook,
+        text: str,
+        builder: Callable[[ttk.Frame], None],
+        refresher: Optional[Callable[[], None]],
+    ) -> ttk.Frame:
+        frame = ttk.Frame(notebook)
+        notebook.add(frame, text=text)
+        ttk.Label(frame, text="Caricamento…").grid(row=0, column=0, padx=6, pady=6)
+        self._lazy_tabs[str(frame)] = (frame, builder, refresher)
+        return frame
+
+    def _on_tab_changed(self, _event=None) -> None:
+        entry = self._lazy_tabs.pop(self.notebook.select(), None)
+        if entry is None:
+            return
+        frame, builder, refresher = entry
+        for child in frame.winfo_children():
+            child.destroy()
+        builder(frame)
+        if refresher is not None and self.db is not None:
+            refresher()
 
     # ---------------------- Tab: Personale ---------------------- #
     def _build_people_tab(self, container: ttk.Frame) -> None:
@@ -126,49 +275,36 @@ class SchedulerManagerApp(tk.Tk):
         tree_frame.rowconfigure(0, weight=1)
         tree_frame.columnconfigure(0, weight=1)
 
-        columns = (
-            "nome",
-            "ruolo",
-            "grado",
-            "autista",
-            "vigile",
-            "weekly_cap",
-            "rest_hours",
-            "telefono",
-            "email",
-        )
         self.people_tree = ttk.Treeview(
             tree_frame,
-            columns=columns,
+            columns=PEOPLE_COLUMNS,
             show="headings",
             selectmode="browse",
         )
-        headers = [
-            ("nome", "Nome completo", 200),
-            ("ruolo", "Ruolo", 120),
-            ("grado", "Grado", 80),
-            ("autista", "Autista", 70),
-            ("vigile", "Vigile", 70),
-            ("weekly_cap", "Turni/sett.", 90),
-            ("rest_hours", "Riposo (h)", 90),
-            ("telefono", "Telefono", 120),
-            ("email", "E-mail", 160),
-        ]
-        for col, label, width in headers:
-            self.people_tree.heading(col, text=label)
-            self.people_tree.column(col, width=width, anchor="center")
+        self._configure_tree_columns(
+            self.people_tree,
+            (
+                ("nome", "Nome completo", 200, "center"),
+                ("ruolo", "Ruolo", 120, "center"),
+                ("grado", "Grado", 80, "center"),
+                ("autista", "Autista", 70, "center"),
+                ("vigile", "Vigile", 70, "center"),
+                ("weekly_cap", "Turni/sett.", 90, "center"),
+                ("rest_hours", "Riposo (h)", 90, "center"),
+                ("telefono", "Telefono", 120, "center"),
+                ("email", "E-mail", 160, "center"),
+            ),
+        )
         self.people_tree.grid(row=0, column=0, sticky="nsew")
         self.people_tree.bind("<<TreeviewSelect>>", self.on_person_select)
 
-        scroll = ttk.Scrollbar(tree_frame, orient="vertical", command=self.people_tree.yview)
-        self.people_tree.configure(yscrollcommand=scroll.set)
-        scroll.grid(row=0, column=1, sticky="ns")
+        self.people_scroll = ttk.Scrollbar(tree_frame, orient="vertical", command=self.people_tree.yview)
+        self.people_tree.configure(yscrollcommand=self.people_scroll.set)
+        self.people_scroll.grid(row=0, column=1, sticky="ns")
 
         # Form di dettaglio
         form = ttk.LabelFrame(container, text="Dettaglio")
         form.grid(row=0, column=1, sticky="nsew")
-        for i in range(9):
-            form.rowconfigure(i, weight=0)
         form.rowconfigure(9, weight=1)
         form.columnconfigure(1, weight=1)
 
@@ -194,7 +330,7 @@ class SchedulerManagerApp(tk.Tk):
             form, textvariable=self.person_role, state="readonly", values=ROLE_OPTIONS
         )
         self.person_role_combo.grid(row=4, column=1, sticky="ew", padx=4, pady=4)
-        self.person_role_combo.bind("<<ComboboxSelected>>", lambda _: self._toggle_grade_state())
+        self.person_role_combo.bind("<<ComboboxSelected>>", self._schedule_grade_toggle)
 
         ttk.Label(form, text="Grado").grid(row=5, column=0, sticky="w", padx=4, pady=4)
         self.person_grade = tk.StringVar(value="JUNIOR")
@@ -235,9 +371,18 @@ class SchedulerManagerApp(tk.Tk):
         )
         help_label.grid(row=9, column=0, columnspan=2, sticky="sw", padx=4, pady=(8, 4))
 
+    def _schedule_grade_toggle(self, _event=None) -> None:
+        if self._grade_toggle_after is not None:
+            self.after_cancel(self._grade_toggle_after)
+        self._grade_toggle_after = self.after(50, self._toggle_grade_state)
+
     def _toggle_grade_state(self) -> None:
+        # Le chiamate dirette (selezione, reset) superano un eventuale aggiornamento in attesa.
+        if self._grade_toggle_after is not None:
+            self.after_cancel(self._grade_toggle_after)
+            self._grade_toggle_after = None
         ruolo = self.person_role.get()
-        if ROLE_VIGILE in ruolo or ROLE_AUTISTA_VIGILE in ruolo:
+        if ruolo in _VIGILE_ROLES:
             self.person_grade_combo.configure(state="readonly")
         else:
             self.person_grade.set("")
@@ -265,20 +410,20 @@ class SchedulerManagerApp(tk.Tk):
         if not row:
             return
         self.selected_person_id = person_id
-        self.person_first_name.set(row["first_name"] or "")
-        self.person_last_name.set(row["last_name"] or "")
-        self.person_phone.set(row["phone"] or "")
-        self.person_email.set(row["email"] or "")
-        ruolo = row["ruolo"] or ROLE_VIGILE
+        self.person_first_name.set(row.first_name or "")
+        self.person_last_name.set(row.last_name or "")
+        self.person_phone.set(row.phone or "")
+        self.person_email.set(row.email or "")
+        ruolo = row.ruolo or ROLE_VIGILE
         if ruolo not in ROLE_OPTIONS:
             ruolo = ROLE_VIGILE
         self.person_role.set(ruolo)
-        if row["is_vigile"]:
-            self.person_grade.set(row["grado"] or "JUNIOR")
+        if row.is_vigile:
+            self.person_grade.set(row.grado or "JUNIOR")
         else:
             self.person_grade.set("")
-        self.person_weekly_cap.set(int(row["weekly_cap"]) if row["weekly_cap"] is not None else DEFAULT_WEEKLY_CAP)
-        self.person_rest_hours.set(int(row["rest_hours"]) if row.get("rest_hours") is not None else 0)
+        self.person_weekly_cap.set(int(row.weekly_cap) if row.weekly_cap is not None else DEFAULT_WEEKLY_CAP)
+        self.person_rest_hours.set(int(row.rest_hours) if row.rest_hours is not None else 0)
         self._toggle_grade_state()
 
     def save_person(self) -> None:
@@ -295,8 +440,8 @@ class SchedulerManagerApp(tk.Tk):
         weekly_cap = max(0, self.person_weekly_cap.get())
         rest_hours = max(0, self.person_rest_hours.get())
 
-        is_autista = ruolo in (ROLE_AUTISTA, ROLE_AUTISTA_VIGILE)
-        is_vigile = ruolo in (ROLE_VIGILE, ROLE_AUTISTA_VIGILE)
+        is_autista = ruolo in _AUTISTA_ROLES
+        is_vigile = ruolo in _VIGILE_ROLES
         if is_vigile:
             livello = grado if grado in ("JUNIOR", "SENIOR") else LIV_JUNIOR
             grado_db = grado if grado else LIV_JUNIOR
@@ -304,9 +449,16 @@ class SchedulerManagerApp(tk.Tk):
             livello = LIV_JUNIOR
             grado_db = ""
 
+        # Elenchi nominativi (coppie, impostazioni) da aggiornare solo se cambiano nome o ruoli.
+        old = self.people_cache.get(self.selected_person_id) if self.selected_person_id is not None else None
+        roster_changed = old is None or (
+            old.name != display_name
+            or bool(old.is_autista) != is_autista
+            or bool(old.is_vigile) != is_vigile
+        )
         try:
             if self.selected_person_id is None:
-                self.db.upsert_person(
+                person_id = self.db.upsert_person(
                     display_name,
                     first_name=first,
                     last_name=last,
@@ -320,8 +472,9 @@ class SchedulerManagerApp(tk.Tk):
                     weekly_cap=weekly_cap,
                     rest_hours=rest_hours,
                 )
+                row = self.db.get_person(person_id)
             else:
-                self.db.update_person(
+                row = self.db.update_person(
                     self.selected_person_id,
                     name=display_name,
                     first_name=first,
@@ -336,64 +489,151 @@ class SchedulerManagerApp(tk.Tk):
                     weekly_cap=weekly_cap,
                     rest_hours=rest_hours,
                 )
-            self.refresh_people_list()
-            self.refresh_pairs_lists()
-            self.refresh_settings_inputs()
         except ValueError as exc:
             messagebox.showerror("Errore", str(exc))
+            return
+        # Applico solo la riga salvata: l'elenco completo si rilegge con "Aggiorna elenco".
+        if row is not None:
+            self._apply_person(Person.from_row(row))
+        if self.selected_person_id is None:
+            self.reset_person_form()
+        else:
+            self.on_person_select()
+        if roster_changed:
+            self._request_refresh("pairs", "settings")
 
     def delete_person(self) -> None:
         if self.selected_person_id is None:
             messagebox.showwarning("Attenzione", "Seleziona prima una persona da eliminare.")
             return
         row = self.people_cache.get(self.selected_person_id)
-        nome = row["name"] if row else "la persona selezionata"
+        nome = row.name if row else "la persona selezionata"
         if not messagebox.askyesno("Conferma", f"Eliminare {nome}? L'operazione è irreversibile."):
             return
-        self.db.delete_person(self.selected_person_id)
+        person_id = self.selected_person_id
+        self.db.delete_person(person_id)
+        self._remove_person(person_id)
         self.reset_person_form()
-        self.refresh_people_list()
-        self.refresh_pairs_lists()
-        self.refresh_settings_inputs()
+        self._request_refresh("pairs", "settings")
+
+    def _apply_person(self, person: Person) -> None:
+        """Aggiorno cache, elenchi nominativi e Treeview con una riga appena salvata."""
+        old = self.people_cache.get(person.id)
+        if old == person:
+            return
+        self.people_cache[person.id] = person
+        if old is not None:
+            self.autisti_names.discard(old.name)
+            self.vigili_names.discard(old.name)
+        if person.is_autista:
+            self.autisti_names.add(person.name)
+        if person.is_vigile:
+            self.vigili_names.add(person.name)
+        iid = str(person.id)
+        if old is None:
+            # Gli id crescono: in fondo rispetta l'ordinamento di list_people.
+            self.people_tree.insert("", "end", iid=iid, values=self._person_tree_values(person))
+        else:
+            self._update_person_item(iid, old, person)
+
+    def _update_person_item(self, iid: str, old: Person, new: Person) -> None:
+        # Scrivo solo le celle cambiate invece di sostituire l'intera tupla values.
+        for column, before, after in zip(
+            PEOPLE_COLUMNS, self._person_tree_values(old), self._person_tree_values(new)
+        ):
+            if before != after:
+                self.people_tree.set(iid, column, after)
+
+    def _remove_person(self, person_id: int) -> None:
+        old = self.people_cache.pop(person_id, None)
+        if old is None:
+            return
+        self.autisti_names.discard(old.name)
+        self.vigili_names.discard(old.name)
+        self.people_tree.delete(str(person_id))
+
+    @staticmethod
+    @contextmanager
+    def _scroll_detached(tree: ttk.Treeview, scrollbar: ttk.Scrollbar) -> Iterator[None]:
+        """Stacco yscrollcommand durante gli inserimenti massivi e lo ricollego alla fine."""
+        tree.configure(yscrollcommand="")
+        try:
+            yield
+        finally:
+            tree.configure(yscrollcommand=scrollbar.set)
+
+    @staticmethod
+    def _configure_tree_columns(tree: ttk.Treeview, columns: Iterable[Tuple[str, str, int, str]]) -> None:
+        """Intestazioni e colonne (id, titolo, larghezza, anchor) in un unico script Tcl."""
+        # Le etichette sono costanti senza graffe: il quoting {…} di Tcl è sufficiente.
+        script = "".join(
+            f"{tree} heading {col} -text {{{label}}}\n{tree} column {col} -width {width} -anchor {anchor}\n"
+            for col, label, width, anchor in columns
+        )
+        tree.tk.eval(script)
+
+    @staticmethod
+    def _person_tree_values(row: Person) -> tuple:
+        return (
+            row.name,
+            row.ruolo or "",
+            row.grado or "",
+            _BOOL_SI_NO[bool(row.is_autista)],
+            _BOOL_SI_NO[bool(row.is_vigile)],
+            row.weekly_cap if row.weekly_cap is not None else DEFAULT_WEEKLY_CAP,
+            row.rest_hours if row.rest_hours is not None else 0,
+            row.phone or "",
+            row.email or "",
+        )
 
     def refresh_people_list(self) -> None:
-        self.people_tree.delete(*self.people_tree.get_children())
-        self.people_cache.clear()
-        self.name_to_id.clear()
+        self._async_query(lambda db: list(db.list_people()), self._apply_people)
+
+    def _apply_people(self, rows: List[sqlite3.Row]) -> None:
+        # Aggiornamento incrementale: confronto con la cache precedente e inserisco,
+        # aggiorno o elimino solo le righe cambiate, senza ricreare tutto il Treeview.
+        tree = self.people_tree
+        previous = self.people_cache
+        cache: Dict[int, Person] = {}
+        self.people_cache = cache
         self.autisti_names.clear()
         self.vigili_names.clear()
 
-        for row in self.db.list_people():
-            person_id = int(row["id"])
-            self.people_cache[person_id] = dict(row)
-            self.name_to_id[row["name"]] = person_id
-            if row["is_autista"]:
-                self.autisti_names.add(row["name"])
-            if row["is_vigile"]:
-                self.vigili_names.add(row["name"])
-
-            self.people_tree.insert(
-                "",
-                "end",
-                iid=str(person_id),
-                values=(
-                    row["name"],
-                    row["ruolo"] or "",
-                    row["grado"] or "",
-                    "Sì" if row["is_autista"] else "No",
-                    "Sì" if row["is_vigile"] else "No",
-                    row["weekly_cap"] if row["weekly_cap"] is not None else DEFAULT_WEEKLY_CAP,
-                    row["rest_hours"] if row["rest_hours"] is not None else 0,
-                    row["phone"] or "",
-                    row["email"] or "",
-                ),
-            )
-
-        if (
-            self.selected_person_id is not None
-            and str(self.selected_person_id) in self.people_tree.get_children()
-        ):
-            self.people_tree.selection_set(str(self.selected_person_id))
+        # Metodi legati a variabili locali: niente lookup di attributi nel ciclo.
+        insert = tree.insert
+        tree_values = self._person_tree_values
+        add_autista = self.autisti_names.add
+        add_vigile = self.vigili_names.add
+        order: List[str] = []
+        add_order = order.append
+        # Scrollbar staccata durante l'inserimento: un solo aggiornamento a fine ciclo.
+        with self._scroll_detached(tree, self.people_scroll):
+            for row in rows:
+                data = Person(*_PERSON_GETTER(row))
+                person_id = data.id
+                cache[person_id] = data
+                if data.is_autista:
+                    add_autista(data.name)
+                if data.is_vigile:
+                    add_vigile(data.name)
+
+                iid = str(person_id)
+                add_order(iid)
+                old = previous.get(person_id)
+                if old is None:
+                    insert("", "end", iid=iid, values=tree_values(data))
+                elif old != data:
+                    self._update_person_item(iid, old, data)
+
+            removed = [str(person_id) for person_id in previous if person_id not in cache]
+            if removed:
+                tree.delete(*removed)
+            # Nuovi nomi o rinomine possono cambiare l'ordinamento: riordino senza ricreare le righe.
+            if tree.get_children() != tuple(order):
+                tree.set_children("", *order)
+
+        if self.selected_person_id is not None and tree.exists(str(self.selected_person_id)):
+            tree.selection_set(str(self.selected_person_id))
         else:
             self.reset_person_form()
 
@@ -414,15 +654,18 @@ class SchedulerManagerApp(tk.Tk):
             show="headings",
             selectmode="browse",
         )
-        self.forbidden_tree.heading("vigile1", text="Vigile 1")
-        self.forbidden_tree.heading("vigile2", text="Vigile 2")
-        self.forbidden_tree.heading("tipo", text="Vincolo")
-        for col in ("vigile1", "vigile2", "tipo"):
-            self.forbidden_tree.column(col, anchor="center", width=150)
+        self._configure_tree_columns(
+            self.forbidden_tree,
+            (
+                ("vigile1", "Vigile 1", 150, "center"),
+                ("vigile2", "Vigile 2", 150, "center"),
+                ("tipo", "Vincolo", 150, "center"),
+            ),
+        )
         self.forbidden_tree.grid(row=0, column=0, sticky="nsew", padx=(0, 4), pady=(0, 4))
-        scroll_f = ttk.Scrollbar(forbidden_group, orient="vertical", command=self.forbidden_tree.yview)
-        self.forbidden_tree.configure(yscrollcommand=scroll_f.set)
-        scroll_f.grid(row=0, column=1, sticky="ns")
+        self.forbidden_scroll = ttk.Scrollbar(forbidden_group, orient="vertical", command=self.forbidden_tree.yview)
+        self.forbidden_tree.configure(yscrollcommand=self.forbidden_scroll.set)
+        self.forbidden_scroll.grid(row=0, column=1, sticky="ns")
 
         form = ttk.Frame(forbidden_group)
         form.grid(row=1, column=0, columnspan=2, sticky="ew", pady=4)
@@ -458,13 +701,18 @@ class SchedulerManagerApp(tk.Tk):
             show="headings",
             selectmode="browse",
         )
-        for col, label in (("autista", "Autista"), ("vigile", "Vigile"), ("tipo", "Vincolo")):
-            self.preferred_tree.heading(col, text=label)
-            self.preferred_tree.column(col, anchor="center", width=150)
+        self._configure_tree_columns(
+            self.preferred_tree,
+            (
+                ("autista", "Autista", 150, "center"),
+                ("vigile", "Vigile", 150, "center"),
+                ("tipo", "Vincolo", 150, "center"),
+            ),
+        )
         self.preferred_tree.grid(row=0, column=0, sticky="nsew", padx=(0, 4), pady=(0, 4))
-        scroll_p = ttk.Scrollbar(preferred_group, orient="vertical", command=self.preferred_tree.yview)
-        self.preferred_tree.configure(yscrollcommand=scroll_p.set)
-        scroll_p.grid(row=0, column=1, sticky="ns")
+        self.preferred_scroll = ttk.Scrollbar(preferred_group, orient="vertical", command=self.preferred_tree.yview)
+        self.preferred_tree.configure(yscrollcommand=self.preferred_scroll.set)
+        self.preferred_scroll.grid(row=0, column=1, sticky="ns")
 
         form_p = ttk.Frame(preferred_group)
         form_p.grid(row=1, column=0, columnspan=2, sticky="ew", pady=4)
@@ -489,31 +737,64 @@ class SchedulerManagerApp(tk.Tk):
         ttk.Button(form_p, text="Aggiungi/Aggiorna", command=self.add_preferred_pair).grid(row=0, column=5, padx=4, pady=2)
         ttk.Button(form_p, text="Elimina selezionata", command=self.delete_preferred_pair).grid(row=0, column=6, padx=4, pady=2)
 
+    def _sorted_people(self, key: str, people: Iterable[Person]) -> SortedPeople:
+        """Restituisco nomi e id ordinati per nome, riusando la cache se l'elenco non è cambiato."""
+        snapshot = frozenset((person.name, person.id) for person in people)
+        cached = self._sorted_cache.get(key)
+        if cached is not None and cached[0] == snapshot:
+            return cached[1]
+        ordered = sorted(snapshot)
+        result: SortedPeople = (tuple(name for name, _ in ordered), tuple(pid for _, pid in ordered))
+        self._sorted_cache[key] = (snapshot, result)
+        return result
+
+    @staticmethod
+    def _selected_id(combo: ttk.Combobox, people: SortedPeople) -> Optional[int]:
+        index = combo.current()
+        return people[1][index] if 0 <= index < len(people[1]) else None
+
     def refresh_pairs_lists(self) -> None:
-        vigili_sorted = sorted(self.vigili_names)
-        autisti_sorted = sorted(self.autisti_names)
-        self.forbidden_vigile1_combo["values"] = vigili_sorted
-        self.forbidden_vigile2_combo["values"] = vigili_sorted
-        self.preferred_autista_combo["values"] = autisti_sorted
-        self.preferred_vigile_combo["values"] = vigili_sorted
-
-        self.forbidden_tree.delete(*self.forbidden_tree.get_children())
-        for pair_id, name1, name2, is_hard in self.db.list_forbidden_pairs_detailed():
-            self.forbidden_tree.insert(
-                "",
-                "end",
-                iid=str(pair_id),
-                values=(name1, name2, "Duro" if is_hard else "Morbido"),
-            )
+        self._async_query(
+            lambda db: (db.list_forbidden_pairs_detailed(), db.list_preferred_pairs_detailed()),
+            self._apply_pairs,
+        )
 
-        self.preferred_tree.delete(*self.preferred_tree.get_children())
-        for pair_id, auto_name, vig_name, is_hard in self.db.list_preferred_pairs_detailed():
-            self.preferred_tree.insert(
-                "",
-                "end",
-                iid=str(pair_id),
-                values=(auto_name, vig_name, "Duro" if is_hard else "Morbido"),
-            )
+    def _apply_pairs(
+        self, pairs: Tuple[List[Tuple[int, str, str, bool]], List[Tuple[int, str, str, bool]]]
+    ) -> None:
+        forbidden, preferred = pairs
+        # Stessa tupla in cache = stesso elenco: salto l'aggiornamento delle combobox.
+        people = self.people_cache.values()
+        vigili = self._sorted_people("vigili", (p for p in people if p.is_vigile))
+        autisti = self._sorted_people("autisti", (p for p in people if p.is_autista))
+        if vigili is not self._pairs_vigili:
+            self._pairs_vigili = vigili
+            self.forbidden_vigile1_combo["values"] = vigili[0]
+            self.forbidden_vigile2_combo["values"] = vigili[0]
+            self.preferred_vigile_combo["values"] = vigili[0]
+        if autisti is not self._pairs_autisti:
+            self._pairs_autisti = autisti
+            self.preferred_autista_combo["values"] = autisti[0]
+
+        with self._scroll_detached(self.forbidden_tree, self.forbidden_scroll):
+            self.forbidden_tree.delete(*self.forbidden_tree.get_children())
+            for pair_id, name1, name2, is_hard in forbidden:
+                self.forbidden_tree.insert(
+                    "",
+                    "end",
+                    iid=str(pair_id),
+                    values=(name1, name2, _HARD_DURO[bool(is_hard)]),
+                )
+
+        with self._scroll_detached(self.preferred_tree, self.preferred_scroll):
+            self.preferred_tree.delete(*self.preferred_tree.get_children())
+            for pair_id, auto_name, vig_name, is_hard in preferred:
+                self.preferred_tree.insert(
+                    "",
+                    "end",
+                    iid=str(pair_id),
+                    values=(auto_name, vig_name, _HARD_DURO[bool(is_hard)]),
+                )
 
     def add_forbidden_pair(self) -> None:
         nome1 = self.forbidden_vigile1.get()
@@ -524,14 +805,14 @@ class SchedulerManagerApp(tk.Tk):
         if nome1 == nome2:
             messagebox.showerror("Errore", "Non è possibile creare un vincolo su una sola persona.")
             return
-        id1 = self.name_to_id.get(nome1)
-        id2 = self.name_to_id.get(nome2)
+        id1 = self._selected_id(self.forbidden_vigile1_combo, self._pairs_vigili)
+        id2 = self._selected_id(self.forbidden_vigile2_combo, self._pairs_vigili)
         if id1 is None or id2 is None:
             messagebox.showerror("Errore", "Vigile non trovato in anagrafica.")
             return
         try:
             self.db.set_forbidden_pair(id1, id2, is_hard=self.forbidden_is_hard.get())
-            self.refresh_pairs_lists()
+            self._request_refresh("pairs")
         except ValueError as exc:
             messagebox.showerror("Errore", str(exc))
 
@@ -541,7 +822,7 @@ class SchedulerManagerApp(tk.Tk):
             messagebox.showwarning("Attenzione", "Seleziona una coppia vietata da eliminare.")
             return
         self.db.delete_forbidden_pair(int(selection[0]))
-        self.refresh_pairs_lists()
+        self._request_refresh("pairs")
 
     def add_preferred_pair(self) -> None:
         autista = self.preferred_autista.get()
@@ -549,14 +830,14 @@ class SchedulerManagerApp(tk.Tk):
         if not autista or not vigile:
             messagebox.showerror("Errore", "Seleziona sia autista sia vigile.")
             return
-        aut_id = self.name_to_id.get(autista)
-        vig_id = self.name_to_id.get(vigile)
+        aut_id = self._selected_id(self.preferred_autista_combo, self._pairs_autisti)
+        vig_id = self._selected_id(self.preferred_vigile_combo, self._pairs_vigili)
         if aut_id is None or vig_id is None:
             messagebox.showerror("Errore", "Autista o vigile non trovati in anagrafica.")
             return
         try:
             self.db.set_preferred_pair(aut_id, vig_id, is_hard=self.preferred_is_hard.get())
-            self.refresh_pairs_lists()
+            self._request_refresh("pairs")
         except ValueError as exc:
             messagebox.showerror("Errore", str(exc))
 
@@ -566,7 +847,7 @@ class SchedulerManagerApp(tk.Tk):
             messagebox.showwarning("Attenzione", "Seleziona una coppia preferenziale da eliminare.")
             return
         self.db.delete_preferred_pair(int(selection[0]))
-        self.refresh_pairs_lists()
+        self._request_refresh("pairs")
 
     # ---------------------- Tab: Ferie ---------------------- #
     def _build_vacations_tab(self, container: ttk.Frame) -> None:
@@ -579,21 +860,26 @@ class SchedulerManagerApp(tk.Tk):
             show="headings",
             selectmode="browse",
         )
-        for col, label in zip(("persona", "inizio", "fine", "nota"), ["Persona", "Dal", "Al", "Nota"]):
-            self.vacations_tree.heading(col, text=label)
-            width = 140 if col in ("inizio", "fine") else 220
-            anchor = "center" if col in ("inizio", "fine") else "w"
-            self.vacations_tree.column(col, width=width, anchor=anchor)
+        self._configure_tree_columns(
+            self.vacations_tree,
+            (
+                ("persona", "Persona", 220, "w"),
+                ("inizio", "Dal", 140, "center"),
+                ("fine", "Al", 140, "center"),
+                ("nota", "Nota", 220, "w"),
+            ),
+        )
         self.vacations_tree.grid(row=0, column=0, sticky="nsew")
 
-        scroll = ttk.Scrollbar(container, orient="vertical", command=self.vacations_tree.yview)
-        self.vacations_tree.configure(yscrollcommand=scroll.set)
-        scroll.grid(row=0, column=1, sticky="ns")
+        self.vacations_scroll = ttk.Scrollbar(container, orient="vertical", command=self.vacations_tree.yview)
+        self.vacations_tree.configure(yscrollcommand=self.vacations_scroll.set)
+        self.vacations_scroll.grid(row=0, column=1, sticky="ns")
 
         form = ttk.Frame(container)
         form.grid(row=1, column=0, columnspan=2, sticky="ew", pady=8)
-        for c in range(6):
-            form.columnconfigure(c, weight=1 if c in (1, 3, 5) else 0)
+        form.columnconfigure(1, weight=1)
+        form.columnconfigure(3, weight=1)
+        form.columnconfigure(5, weight=1)
 
         ttk.Label(form, text="Persona").grid(row=0, column=0, padx=4, pady=2, sticky="w")
         self.vacation_person = tk.StringVar()
@@ -623,29 +909,36 @@ class SchedulerManagerApp(tk.Tk):
         helper.grid(row=2, column=0, columnspan=2, sticky="w", padx=4, pady=(6, 0))
 
     def refresh_vacations(self) -> None:
-        self.vacations_tree.delete(*self.vacations_tree.get_children())
-        for row in self.db.list_vacations():
-            self.vacations_tree.insert(
-                "",
-                "end",
-                iid=str(row["id"]),
-                values=(row["person_name"], row["start_date"], row["end_date"], row["note"] or ""),
-            )
-        all_names = sorted(self.name_to_id.keys())
-        self.vacation_person_combo["values"] = all_names
+        self._async_query(lambda db: list(db.list_vacations()), self._apply_vacations)
+
+    def _apply_vacations(self, rows: List[sqlite3.Row]) -> None:
+        with self._scroll_detached(self.vacations_tree, self.vacations_scroll):
+            self.vacations_tree.delete(*self.vacations_tree.get_children())
+            for row in rows:
+                self.vacations_tree.insert(
+                    "",
+                    "end",
+                    iid=str(row["id"]),
+                    values=(row["person_name"], row["start_date"], row["end_date"], row["note"] or ""),
+                )
+        # _sorted_people restituisce la stessa tupla se l'elenco non è cambiato: salto la riassegnazione.
+        people = self._sorted_people("tutti", self.people_cache.values())
+        if people is not self._vacation_people:
+            self._vacation_people = people
+            self.vacation_person_combo["values"] = people[0]
 
     def add_vacation(self) -> None:
         nome = self.vacation_person.get()
         if not nome:
             messagebox.showerror("Errore", "Seleziona una persona.")
             return
-        person_id = self.name_to_id.get(nome)
+        person_id = self._selected_id(self.vacation_person_combo, self._vacation_people)
         if person_id is None:
             messagebox.showerror("Errore", "Persona non trovata.")
             return
         try:
-            start = datetime.strptime(self.vacation_start.get().strip(), "%Y-%m-%d").date()
-            end = datetime.strptime(self.vacation_end.get().strip(), "%Y-%m-%d").date()
+            start = _parse_iso_date(self.vacation_start.get())
+            end = _parse_iso_date(self.vacation_end.get())
         except ValueError:
             messagebox.showerror("Errore", "Date non valide. Usa il formato YYYY-MM-DD.")
             return
@@ -655,7 +948,7 @@ class SchedulerManagerApp(tk.Tk):
             self.vacation_start.set("")
             self.vacation_end.set("")
             self.vacation_note.set("")
-            self.refresh_vacations()
+            self._request_refresh("vacations")
         except ValueError as exc:
             messagebox.showerror("Errore", str(exc))
 
@@ -665,27 +958,40 @@ class SchedulerManagerApp(tk.Tk):
             messagebox.showwarning("Attenzione", "Seleziona un periodo di ferie da eliminare.")
             return
         self.db.remove_vacation(int(selection[0]))
-        self.refresh_vacations()
+        self._request_refresh("vacations")
 
     # ---------------------- Tab: Impostazioni generali ---------------------- #
     def _build_settings_tab(self, container: ttk.Frame) -> None:
-        for i in range(6):
-            container.rowconfigure(i, weight=0)
         container.columnconfigure(1, weight=1)
 
         ttk.Label(container, text="Autista speciale (solo venerdì)").grid(row=0, column=0, padx=6, pady=6, sticky="w")
         self.setting_autista_varchi = tk.StringVar()
-        self.setting_autista_varchi_combo = ttk.Combobox(container, textvariable=self.setting_autista_varchi, state="readonly")
+        self.setting_autista_varchi_combo = ttk.Combobox(
+            container,
+            textvariable=self.setting_autista_varchi,
+            state="readonly",
+            postcommand=self._fill_settings_autisti,
+        )
         self.setting_autista_varchi_combo.grid(row=0, column=1, padx=6, pady=6, sticky="ew")
 
         ttk.Label(container, text="Autista con vincolo Pogliani").grid(row=1, column=0, padx=6, pady=6, sticky="w")
         self.setting_autista_pogliani = tk.StringVar()
-        self.setting_autista_pogliani_combo = ttk.Combobox(container, textvariable=self.setting_autista_pogliani, state="readonly")
+        self.setting_autista_pogliani_combo = ttk.Combobox(
+            container,
+            textvariable=self.setting_autista_pogliani,
+            state="readonly",
+            postcommand=self._fill_settings_autisti,
+        )
         self.setting_autista_pogliani_combo.grid(row=1, column=1, padx=6, pady=6, sticky="ew")
 
         ttk.Label(container, text="Vigile escluso in estate (Luglio/Agosto)").grid(row=2, column=0, padx=6, pady=6, sticky="w")
         self.setting_vigile_estate = tk.StringVar()
-        self.setting_vigile_estate_combo = ttk.Combobox(container, textvariable=self.setting_vigile_estate, state="readonly")
+        self.setting_vigile_estate_combo = ttk.Combobox(
+            container,
+            textvariable=self.setting_vigile_estate,
+            state="readonly",
+            postcommand=self._fill_settings_vigili,
+        )
         self.setting_vigile_estate_combo.grid(row=2, column=1, padx=6, pady=6, sticky="ew")
 
         self.setting_varchi_rule = tk.BooleanVar(value=True)
@@ -721,6 +1027,8 @@ class SchedulerManagerApp(tk.Tk):
                 mode_combo.configure(state="disabled", values=[hard_label])
             value_var: Optional[tk.IntVar] = None
             value_widget: Optional[ttk.Spinbox] = None
+            # Stato iniziale già coerente con la modalità: niente configure() successivo.
+            value_state = self._rule_value_state(mode_var.get())
             if definition.has_value:
                 value_var = self.setting_min_esperti
                 spin = ttk.Spinbox(
@@ -729,6 +1037,7 @@ class SchedulerManagerApp(tk.Tk):
                     to=definition.max_value or 10,
                     textvariable=value_var,
                     width=5,
+                    state=value_state,
                 )
                 spin.grid(row=idx, column=2, padx=4, pady=4, sticky="w")
                 value_widget = spin
@@ -740,27 +1049,31 @@ class SchedulerManagerApp(tk.Tk):
                 "value_var": value_var,
                 "definition": definition,
                 "value_widget": value_widget,
+                "value_state": value_state,
             }
             mode_combo.bind("<<ComboboxSelected>>", lambda _, k=key: self._on_rule_mode_changed(k))
 
-        for key in self.generation_rule_vars:
-            self._on_rule_mode_changed(key)
-
         giorni_frame = ttk.LabelFrame(container, text="Giorni della settimana da pianificare")
         giorni_frame.grid(row=5, column=0, columnspan=2, sticky="ew", padx=6, pady=10)
-        self.setting_weekdays: Dict[int, tk.BooleanVar] = {}
-        for idx, dow in enumerate(range(7)):
-            var = tk.BooleanVar(value=dow in DEFAULT_ACTIVE_WEEKDAYS)
-            self.setting_weekdays[dow] = var
-            ttk.Checkbutton(giorni_frame, text=WEEKDAY_LABELS[dow], variable=var).grid(
-                row=0, column=idx, padx=4, pady=4, sticky="w"
+        # Classi e costanti legate a variabili locali: niente lookup globali nel ciclo.
+        check = ttk.Checkbutton
+        bool_var = tk.BooleanVar
+        default_weekdays = DEFAULT_ACTIVE_WEEKDAYS
+        self.setting_weekdays: Dict[int, tk.BooleanVar] = {
+            dow: bool_var(value=dow in default_weekdays) for dow in range(7)
+        }
+        for dow, var in self.setting_weekdays.items():
+            check(giorni_frame, text=WEEKDAY_LABELS[dow], variable=var).grid(
+                row=0, column=dow, padx=4, pady=4, sticky="w"
             )
 
         btn_frame = ttk.Frame(container)
         btn_frame.grid(row=6, column=0, columnspan=2, pady=12)
-        ttk.Button(btn_frame, text="Salva impostazioni", command=self.save_settings).grid(row=0, column=0, padx=4)
+        self.settings_save_button = ttk.Button(btn_frame, text="Salva impostazioni", command=self.save_settings)
+        self.settings_save_button.grid(row=0, column=0, padx=4)
         ttk.Button(btn_frame, text="Ricarica", command=self.refresh_settings_inputs).grid(row=0, column=1, padx=4)
-        ttk.Button(btn_frame, text="Ripristina default", command=self.reset_generation_rules).grid(row=0, column=2, padx=4)
+        self.settings_reset_button = ttk.Button(btn_frame, text="Ripristina default", command=self.reset_generation_rules)
+        self.settings_reset_button.grid(row=0, column=2, padx=4)
 
         helper = ttk.Label(
             container,
@@ -774,13 +1087,28 @@ class SchedulerManagerApp(tk.Tk):
         )
         helper.grid(row=7, column=0, columnspan=2, sticky="w", padx=6, pady=(8, 0))
 
-    def refresh_settings_inputs(self) -> None:
-        values_autisti = [""] + sorted(self.autisti_names)
-        values_vigili = [""] + sorted(self.vigili_names)
-        self.setting_autista_varchi_combo["values"] = values_autisti
-        self.setting_autista_pogliani_combo["values"] = values_autisti
-        self.setting_vigile_estate_combo["values"] = values_vigili
+    def _fill_settings_autisti(self) -> None:
+        # Stessi elenchi ordinati (e in cache) della scheda coppie: riassegno solo se cambiano.
+        autisti = self._sorted_people("autisti", (p for p in self.people_cache.values() if p.is_autista))
+        if autisti is not self._settings_autisti:
+            self._settings_autisti = autisti
+            values_autisti = ("",) + autisti[0]
+            self.setting_autista_varchi_combo["values"] = values_autisti
+            self.setting_autista_pogliani_combo["values"] = values_autisti
+
+    def _fill_settings_vigili(self) -> None:
+        vigili = self._sorted_people("vigili", (p for p in self.people_cache.values() if p.is_vigile))
+        if vigili is not self._settings_vigili:
+            self._settings_vigili = vigili
+            self.setting_vigile_estate_combo["values"] = ("",) + vigili[0]
 
+    def refresh_settings_inputs(self) -> None:
+        if self._settings_saving:
+            # Un salvataggio è in corso: rileggere ora sovrascriverebbe il form con i valori
+            # precedenti. Il refresh viene eseguito al termine (_finish_settings_save).
+            self._settings_refresh_deferred = True
+            return
+        # Gli elenchi delle combobox si caricano all'apertura del menu (postcommand).
         settings = self.db.all_settings()
         self.setting_autista_varchi.set(settings.get("autista_varchi", ""))
         self.setting_autista_pogliani.set(settings.get("autista_pogliani", ""))
@@ -791,11 +1119,7 @@ class SchedulerManagerApp(tk.Tk):
             self.setting_min_esperti.set(DEFAULT_MIN_ESPERTI)
         self.setting_varchi_rule.set(settings.get("enable_varchi_rule", "1") != "0")
 
-        attivi = settings.get(
-            "active_weekdays",
-            ",".join(str(x) for x in sorted(DEFAULT_ACTIVE_WEEKDAYS)),
-        )
-        selezionati = {int(token) for token in attivi.split(",") if token.strip().isdigit()}
+        selezionati = decode_weekdays(settings.get("active_weekdays"))
         if not selezionati:
             selezionati = set(DEFAULT_ACTIVE_WEEKDAYS)
         for dow, var in self.setting_weekdays.items():
@@ -822,6 +1146,8 @@ class SchedulerManagerApp(tk.Tk):
             self.setting_min_esperti.set(rule_configs["min_senior"].value)
 
     def save_settings(self) -> None:
+        if self._settings_saving:
+            return
         autisti_validi = self.autisti_names
         vigili_validi = self.vigili_names
 
@@ -829,19 +1155,19 @@ class SchedulerManagerApp(tk.Tk):
             value = value.strip()
             return value if value and value in valid else None
 
-        self.db.set_setting("autista_varchi", _normalize(self.setting_autista_varchi.get(), autisti_validi))
-        self.db.set_setting("autista_pogliani", _normalize(self.setting_autista_pogliani.get(), autisti_validi))
-        self.db.set_setting("vigile_escluso_estate", _normalize(self.setting_vigile_estate.get(), vigili_validi))
-        self.db.set_setting("min_esperti", str(max(0, min(4, self.setting_min_esperti.get()))))
-        self.db.set_setting("enable_varchi_rule", "1" if self.setting_varchi_rule.get() else "0")
-
-        weekday_string = ",".join(
-            str(dow) for dow, var in self.setting_weekdays.items() if var.get()
-        )
-        if not weekday_string:
-            weekday_string = ",".join(str(x) for x in sorted(DEFAULT_ACTIVE_WEEKDAYS))
-        self.db.set_setting("active_weekdays", weekday_string)
+        selezionati = [dow for dow, var in self.setting_weekdays.items() if var.get()]
+        if not selezionati:
+            selezionati = sorted(DEFAULT_ACTIVE_WEEKDAYS)
+        settings_pairs: List[Tuple[str, Optional[str]]] = [
+            ("autista_varchi", _normalize(self.setting_autista_varchi.get(), autisti_validi)),
+            ("autista_pogliani", _normalize(self.setting_autista_pogliani.get(), autisti_validi)),
+            ("vigile_escluso_estate", _normalize(self.setting_vigile_estate.get(), vigili_validi)),
+            ("min_esperti", str(max(0, min(4, self.setting_min_esperti.get())))),
+            ("enable_varchi_rule", "1" if self.setting_varchi_rule.get() else "0"),
+            ("active_weekdays", encode_weekdays(selezionati)),
+        ]
 
+        rules_pairs: Dict[str, GenerationRuleConfig] = {}
         for key, data in self.generation_rule_vars.items():
             definition = data["definition"]
             if key == "weekly_cap":
@@ -858,18 +1184,45 @@ class SchedulerManagerApp(tk.Tk):
                     value = min(definition.max_value, value)
                 data["value_var"].set(value)
                 config.value = value
-            self.db.save_generation_rule(key, config)
+            rules_pairs[key] = config
+
+        # Le variabili Tk sono già lette: la scrittura gira sul thread del DB, in coda alle letture.
+        def _write(db: Database) -> None:
+            # Impostazioni e regole in un'unica transazione, con executemany invece di N scritture.
+            with db.transaction():
+                db.set_settings_bulk(settings_pairs)
+                db.save_generation_rules_bulk(rules_pairs)
+
+        self._settings_saving = True
+        self.settings_save_button.configure(state="disabled")
+        self.settings_reset_button.configure(state="disabled")
+        self._async_query(_write, self._on_settings_saved, self._on_settings_save_failed)
+
+    def _finish_settings_save(self) -> None:
+        self._settings_saving = False
+        self.settings_save_button.configure(state="normal")
+        self.settings_reset_button.configure(state="normal")
+        if self._settings_refresh_deferred:
+            self._settings_refresh_deferred = False
+            self.refresh_settings_inputs()
+
+    def _on_settings_saved(self, _result: object = None) -> None:
+        self._finish_settings_save()
         messagebox.showinfo("Impostazioni salvate", "Le impostazioni sono state aggiornate correttamente.")
 
+    def _on_settings_save_failed(self, error: Exception) -> None:
+        self._finish_settings_save()
+        messagebox.showerror("Errore", f"Impossibile salvare le impostazioni: {error}")
+
     def reset_generation_rules(self) -> None:
         self.db.reset_generation_rules_to_defaults()
-        self.refresh_settings_inputs()
+        self._request_refresh("settings")
         messagebox.showinfo("Ripristino completato", "Le regole di generazione sono tornate ai valori di default.")
 
     # ---------------------- Tab: Generazione turni ---------------------- #
     def _build_generation_tab(self, container: ttk.Frame) -> None:
-        for c in range(4):
-            container.columnconfigure(c, weight=1 if c in (1, 3) else 0)
+        container.columnconfigure(1, weight=1)
+        container.columnconfigure(3, weight=1)
 
         row = 0
         ttk.Label(container, text="Anno da pianificare").grid(row=row, column=0, padx=6, pady=6, sticky="w")
@@ -893,11 +1246,11 @@ class SchedulerManagerApp(tk.Tk):
             variable=self.gen_all_months,
             command=self._toggle_all_months,
         ).grid(row=0, column=0, padx=4, pady=(0, 4), sticky="w")
-        self.gen_month_vars: Dict[int, tk.BooleanVar] = {}
-        for index, mese in enumerate(range(1, 13)):
-            var = tk.BooleanVar(value=True)
-            self.gen_month_vars[mese] = var
-            ttk.Checkbutton(
+        check = ttk.Checkbutton
+        bool_var = tk.BooleanVar
+        self.gen_month_vars: Dict[int, tk.BooleanVar] = {mese: bool_var(value=True) for mese in range(1, 13)}
+        for index, (mese, var) in enumerate(self.gen_month_vars.items()):
+            check(
                 months_frame,
                 text=MONTH_LABELS[mese],
                 variable=var,
@@ -975,8 +1328,6 @@ class SchedulerManagerApp(tk.Tk):
         btn_frame = ttk.Frame(container)
         btn_frame.grid(row=row, column=0, columnspan=4, pady=12, sticky="ew")
         btn_frame.columnconfigure(0, weight=1)
-        btn_frame.columnconfigure(1, weight=0)
-        btn_frame.columnconfigure(2, weight=0)
 
         self.generate_button = ttk.Button(btn_frame, text="Genera turni", command=self.run_generation)
         self.generate_button.grid(row=0, column=0, padx=6, sticky="w")
@@ -1047,10 +1398,17 @@ class SchedulerManagerApp(tk.Tk):
         mode_var = data.get("mode_var")
         if not widget or mode_var is None:
             return
+        desired = self._rule_value_state(mode_var.get())
+        # Riconfiguro lo Spinbox solo se lo stato cambia davvero.
+        if data.get("value_state") != desired:
+            widget.configure(state=desired)
+            data["value_state"] = desired
+
+    @staticmethod
+    def _rule_value_state(mode_display: str) -> str:
         # Disattivando una regola non serve consentire l'editing del relativo valore numerico
-        mode_display = mode_var.get()
         mode_value = MODE_FROM_DISPLAY.get(mode_display, RuleMode.HARD.value)
-        widget.configure(state="normal" if mode_value != RuleMode.OFF.value else "disabled")
+        return "normal" if mode_value != RuleMode.OFF.value else "disabled"
 
     def _toggle_all_months(self) -> None:
         stato = self.gen_all_months.get()
@@ -1142,7 +1500,7 @@ class SchedulerManagerApp(tk.Tk):
         self.generate_button.configure(state="disabled")
         self.generate_running = True
         threading.Thread(target=self._run_generation_thread, args=(cmd,), daemon=True).start()
-        self.after(100, self._poll_generation_queue)
+        self._poll_generation_queue()
 
     def _run_generation_thread(self, cmd: List[str]) -> None:
         try:
@@ -1154,10 +1512,33 @@ class SchedulerManagerApp(tk.Tk):
                 text=True,
                 encoding=encoding,
                 errors="replace",
+                bufsize=1,
             )
             assert process.stdout is not None
-            for line in process.stdout:
-                self.generate_queue.put(line)
+            # Un thread legge le righe; qui le raggruppo (max _GENERATE_BATCH_LINES) in un solo put.
+            # L'attesa con timeout invia comunque il lotto entro _GENERATE_BATCH_SECONDS dalla
+            # sua prima riga, anche se il processo resta in silenzio.
+            lines: "queue.Queue[Optional[str]]" = queue.Queue()
+            threading.Thread(target=self._read_generation_output, args=(process.stdout, lines), daemon=True).start()
+            batch: List[str] = []
+            deadline = 0.0
+            while True:
+                try:
+                    line = lines.get(timeout=max(0.0, deadline - time.monotonic()) if batch else None)
+                except queue.Empty:
+                    self.generate_queue.put("".join(batch))
+                    batch.clear()
+                    continue
+                if line is None:
+                    break
+                if not batch:
+                    deadline = time.monotonic() + _GENERATE_BATCH_SECONDS
+                batch.append(line)
+                if len(batch) >= _GENERATE_BATCH_LINES:
+                    self.generate_queue.put("".join(batch))
+                    batch.clear()
+            if batch:
+                self.generate_queue.put("".join(batch))
             returncode = process.wait()
             if returncode == 0:
                 self.generate_queue.put("Generazione completata con successo.\n")
@@ -1170,18 +1551,35 @@ class SchedulerManagerApp(tk.Tk):
         finally:
             self.generate_queue.put("__END__")
 
-    def _poll_generation_queue(self) -> None:
+    @staticmethod
+    def _read_generation_output(stream, lines: "queue.Queue[Optional[str]]") -> None:
         try:
-            while True:
+            for line in stream:
+                lines.put(line)
+        finally:
+            lines.put(None)
+
+    def _poll_generation_queue(self) -> None:
+        # Al massimo _GENERATE_DRAIN_CHUNK messaggi per giro, scritti nel Text con un solo insert:
+        # un log lungo non blocca la UI e a processo terminato il polling si ferma.
+        chunk: List[str] = []
+        finished = False
+        for _ in range(_GENERATE_DRAIN_CHUNK):
+            try:
                 message = self.generate_queue.get_nowait()
-                if message == "__END__":
-                    self.generate_running = False
-                    self.generate_button.configure(state="normal")
-                    return
-                self._append_generation_output(message)
-        except queue.Empty:
-            if self.generate_running:
-                self.after(100, self._poll_generation_queue)
+            except queue.Empty:
+                break
+            if message == "__END__":
+                finished = True
+                break
+            chunk.append(message)
+        if chunk:
+            self._append_generation_output("".join(chunk))
+        if finished:
+            self.generate_running = False
+            self.generate_button.configure(state="normal")
+        elif self.generate_running or not self.generate_queue.empty():
+            self.after(30, self._poll_generation_queue)
 
     def _open_output_folder(self) -> None:
         path = Path(self.gen_output_dir.get())
@@ -1200,14 +1598,112 @@ class SchedulerManagerApp(tk.Tk):
 
     # ---------------------- Utilità globali ---------------------- #
     def refresh_all(self) -> None:
-        self.refresh_people_list()
-        self.refresh_pairs_lists()
-        self.refresh_vacations()
-        self.refresh_settings_inputs()
+        self._refresh_kinds({"people", "pairs", "vacations", "settings"})
+
+    def _refresh_kinds(self, kinds: Set[str]) -> None:
+        # Le schede non ancora costruite si aggiornano alla prima apertura.
+        for kind, frame, refresher in self._tab_refreshers:
+            if kind in kinds and str(frame) not in self._lazy_tabs:
+                refresher()
+
+    def _async_query(
+        self,
+        query: Callable[[Database], object],
+        callback: Callable[[object], None],
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ) -> None:
+        """Eseguo l'operazione sul DB fuori dal thread Tk e applico il risultato con callback al polling.
+
+        ``query`` riceve la Database del worker, con una connessione distinta da ``self.db``.
+        In caso di eccezione viene chiamato ``on_error`` (se assente, un messaggio generico).
+        """
+        if self._query_worker is None:
+            self._query_worker = threading.Thread(target=self._query_worker_loop, daemon=True)
+            self._query_worker.start()
+        self._query_pending += 1
+        self._query_requests.put((query, callback, on_error))
+        if self._query_poll_id is None:
+            self._query_poll_id = self.after(20, self._poll_query_queue)
+
+    def _query_worker_loop(self) -> None:
+        # Un solo thread per il DB: i risultati arrivano nell'ordine delle richieste, quindi
+        # l'elenco persone viene applicato prima delle schede che ne usano i nomi.
+        # Connessione propria: transazioni e cursori del worker non si mescolano con quelli
+        # del thread Tk, e con WAL le letture vedono solo dati già confermati.
+        db: Optional[Database] = None
+        open_error: Optional[Exception] = None
+        try:
+            db = Database(self.db_path)
+        except Exception as exc:
+            open_error = exc
+        try:
+            while True:
+                request = self._query_requests.get()
+                if request is None:
+                    return
+                query, callback, on_error = request
+                if db is None:
+                    self._query_queue.put((callback, on_error, None, open_error))
+                    continue
+                try:
+                    result = query(db)
+                except Exception as exc:
+                    self._query_queue.put((callback, on_error, None, exc))
+                else:
+                    self._query_queue.put((callback, on_error, result, None))
+        finally:
+            if db is not None:
+                db.close()
+
+    def _poll_query_queue(self) -> None:
+        self._query_poll_id = None
+        while True:
+            try:
+                callback, on_error, result, error = self._query_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._query_pending -= 1
+            if error is not None:
+                if on_error is not None:
+                    on_error(error)
+                else:
+                    messagebox.showerror("Errore", f"Operazione sul database non riuscita: {error}")
+            else:
+                callback(result)
+        if self._query_pending:
+            self._query_poll_id = self.after(20, self._poll_query_queue)
+
+    def _request_refresh(self, *kinds: str) -> None:
+        """Accodo i refresh richiesti: più azioni nello stesso ciclo producono un solo aggiornamento."""
+        self._refresh_pending.update(kinds)
+        if self._refresh_after_id is None:
+            self._refresh_after_id = self.after_idle(self._flush_refresh)
+
+    def _flush_refresh(self) -> None:
+        self._refresh_after_id = None
+        pending, self._refresh_pending = self._refresh_pending, set()
+        self._refresh_kinds(pending)
 
     def on_close(self) -> None:
+        if self._refresh_after_id is not None:
+            self.after_cancel(self._refresh_after_id)
+            self._refresh_after_id = None
+        if self._db_poll_id is not None:
+            self.after_cancel(self._db_poll_id)
+            self._db_poll_id = None
+        if self._grade_toggle_after is not None:
+            self.after_cancel(self._grade_toggle_after)
+            self._grade_toggle_after = None
+        if self._query_poll_id is not None:
+            self.after_cancel(self._query_poll_id)
+            self._query_poll_id = None
+        if self._query_worker is not None:
+            # Attendo l'eventuale lettura in corso prima di chiudere la connessione.
+            self._query_requests.put(None)
+            self._query_worker.join(timeout=1.0)
         try:
-            self.db.close()
+            if self.db is not None:
+                self.db.close()
         finally:
             self.destroy()
 
@@ -134,9 +134,12 @@ class Scheduler:
         anno: int,
         config: ProgramConfig,
         months: Optional[Iterable[int]] = None,
+        rng: Optional[random.Random] = None,
     ):
         self.anno = anno
         self.config = config
+        # Generatore dedicato per gli spareggi casuali: niente stato globale condiviso.
+        self.rng = rng if rng is not None else random.Random()
 
         self.autisti: List[str] = sorted(config.autisti)
         self.vigili: List[str] = sorted(config.vigili)
@@ -460,7 +463,7 @@ class Scheduler:
                 self.cont_aut.tot_annuale(nome),
                 self.cont_aut.tot_giorno_anno(nome, dow),
                 1 if self.cont_aut.ultimo_dow(nome) == dow else 0,
-                random.random(),
+                self.rng.random(),
             )
         )
         scelto = pool[0]
@@ -640,7 +643,7 @@ class Scheduler:
                 carico_giorno,
                 ripetizioni_recenti,
                 preferenze_soft,
-                random.random(),
+                self.rng.random(),
             )
             soluzioni.append((punteggio, team, {"violazioni_soft": violazioni_soft}))
 
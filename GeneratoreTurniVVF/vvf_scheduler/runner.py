@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+import random
 from pathlib import Path
 from typing import Optional, Sequence, Tuple
 
@@ -21,8 +22,11 @@ def esegui(
     out_dir: Path,
     months: Optional[Sequence[int]] = None,
     seed: Optional[int] = None,
+    rng: Optional[random.Random] = None,
 ) -> Tuple[Path, Path, Path, Scheduler]:
-    scheduler = Scheduler(anno, config, months)
+    if rng is None:
+        rng = random.Random(seed)
+    scheduler = Scheduler(anno, config, months, rng)
     assegnazioni = scheduler.costruisci()
 
     out_dir.mkdir(parents=True, exist_ok=True)